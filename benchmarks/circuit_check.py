@@ -0,0 +1,85 @@
+# This file checks the per-host circuit breaker of the downloads through fetch_article against the mock vendor
+# server: a failing site opens the circuit, its URLs then fail without a request, a trial request throttled with
+# Retry-After keeps the circuit open for another cool-down, and after it one trial request to the recovered site
+# closes the circuit again. Run it from the project root:
+#     python benchmarks/circuit_check.py
+
+import argparse
+import logging
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import main as scraper  # noqa: E402
+from parsers.parser_base import ParserBase  # noqa: E402
+from mock_servers import MockVendorServer, article_urls  # noqa: E402
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check the open -> cool-down -> trial -> close cycle of the "
+                                                     "download circuit breaker.")
+    arg_parser.add_argument('--failure-threshold', type=int, default=2)
+    arg_parser.add_argument('--reset-timeout', type=float, default=1.0, help="cool-down of the circuit in seconds")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+
+    server = MockVendorServer(latency=0.01, jitter=0.0, error_rate=1.0).start()
+    failures = []
+
+    def expect(condition, description):
+        print(f"  {'ok  ' if condition else 'FAIL'} {description}")
+        if not condition:
+            failures.append(description)
+
+    try:
+        ParserBase.configure_fetcher(proxies={'http': server.url}, retries=0,
+                                     failure_threshold=args.failure_threshold, reset_timeout=args.reset_timeout)
+        breaker = ParserBase.fetcher.breaker
+        url = article_urls(1)[0]
+        host = urlparse(url).hostname
+
+        print(f"Site failing ({host}):")
+        for _ in range(args.failure_threshold):
+            scraper.fetch_article({'url': url})
+        expect(breaker.is_open(host), f"circuit open after {args.failure_threshold} failed downloads")
+
+        requests_before = server.stats().get('requests', 0)
+        job = scraper.fetch_article({'url': url})
+        expect(job is None and server.stats().get('requests', 0) == requests_before,
+               "download refused without a request while the circuit is open")
+
+        print("Site throttling (503 with Retry-After), after the cool-down:")
+        server.retry_after = 1
+        time.sleep(args.reset_timeout + 0.1)
+        requests_before = server.stats().get('requests', 0)
+        job = scraper.fetch_article({'url': url})
+        expect(job is None and server.stats().get('requests', 0) == requests_before + 1, "trial download made")
+        expect(breaker.is_open(host) and host not in breaker.trials,
+               "circuit open for another cool-down, trial released")
+
+        print("Site recovered, after the cool-down:")
+        server.error_rate = 0.0
+        server.retry_after = None
+        time.sleep(args.reset_timeout + 0.1)
+        job = scraper.fetch_article({'url': url})
+        expect(job is not None and job.get('html'), "trial download succeeds")
+        expect(not breaker.is_open(host) and host not in breaker.trials, "circuit closed after the trial")
+        job = scraper.fetch_article({'url': url})
+        expect(job is not None, "next download goes through")
+    finally:
+        server.stop()
+        ParserBase.fetcher.close()
+
+    if failures:
+        print(f"{len(failures)} check(s) failed.")
+        sys.exit(1)
+    print("Circuit breaker cycle OK.")
+
+
+if __name__ == '__main__':
+    main()
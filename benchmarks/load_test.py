@@ -0,0 +1,194 @@
+# This file load tests the whole scraping pipeline (fetch -> extract -> GPT -> write) against the mock servers.
+# The mock vendor sites and Azure OpenAI endpoint run in a separate process, so they do not compete with the
+# pipeline for the GIL. The report shows the URLs processed per second and the end-to-end latency percentiles.
+#     python benchmarks/load_test.py --urls 500 --llm-tpm 200000
+# With --batch, the GPT requests go through the mock Batch API after all articles are extracted, as in main.py --batch.
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from openai import AzureOpenAI
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import main as scraper  # noqa: E402
+from parsers.parser_base import ParserBase  # noqa: E402
+from parsers.extraction_pool import ExtractionPool  # noqa: E402
+from utils.output_writer import create_sink  # noqa: E402
+from utils.pipeline import Pipeline, Stage  # noqa: E402
+from utils.metrics import metrics  # noqa: E402
+from utils.llm_client import AsyncLLMClient  # noqa: E402
+from utils.llm_batch import BatchRunner  # noqa: E402
+from utils.resilience import RetryPolicy  # noqa: E402
+from mock_servers import article_urls  # noqa: E402
+from parser_bench import percentile  # noqa: E402
+
+
+def start_mock_servers(args):
+    """
+    Starts benchmarks/mock_servers.py in a child process and waits until both servers answer.
+
+    Returns:
+        subprocess.Popen: The mock servers process.
+    """
+    command = [
+        sys.executable, os.path.join(PROJECT_DIR, 'benchmarks', 'mock_servers.py'),
+        '--vendor-port', str(args.vendor_port), '--llm-port', str(args.llm_port),
+        '--vendor-latency-ms', str(args.vendor_latency_ms), '--vendor-error-rate', str(args.vendor_error_rate),
+        '--llm-latency-ms', str(args.llm_latency_ms), '--llm-tokens-per-second', str(args.llm_tokens_per_second),
+        '--llm-rpm', str(args.llm_rpm), '--llm-tpm', str(args.llm_tpm),
+        '--batch-latency-s', str(args.batch_latency_s), '--batch-error-rate', str(args.batch_error_rate)
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            read_stats(args.vendor_port)
+            read_stats(args.llm_port)
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("The mock servers did not start.")
+
+
+def read_stats(port):
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stats', timeout=2) as response:
+        return json.load(response)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Load test the scraping pipeline against the mock servers.")
+    arg_parser.add_argument('--urls', type=int, default=200, help="number of article URLs to process")
+    arg_parser.add_argument('--fetch-workers', type=int, default=8)
+    arg_parser.add_argument('--extract-workers', type=int, default=2)
+    arg_parser.add_argument('--extract-processes', type=int, default=0)
+    arg_parser.add_argument('--llm-concurrency', type=int, default=32, help="most GPT requests in flight")
+    arg_parser.add_argument('--llm-initial-concurrency', type=int, default=4)
+    arg_parser.add_argument('--client-tpm', type=int, default=0, help="tokens per minute the client paces to")
+    arg_parser.add_argument('--client-rpm', type=int, default=0, help="requests per minute the client paces to")
+    arg_parser.add_argument('--queue-size', type=int, default=32)
+    arg_parser.add_argument('--vendor-port', type=int, default=8081)
+    arg_parser.add_argument('--llm-port', type=int, default=8082)
+    arg_parser.add_argument('--vendor-latency-ms', type=float, default=50)
+    arg_parser.add_argument('--vendor-error-rate', type=float, default=0.0)
+    arg_parser.add_argument('--llm-latency-ms', type=float, default=300)
+    arg_parser.add_argument('--llm-tokens-per-second', type=float, default=80)
+    arg_parser.add_argument('--llm-rpm', type=int, default=0)
+    arg_parser.add_argument('--llm-tpm', type=int, default=0)
+    arg_parser.add_argument('--batch', action='store_true', help="send the GPT requests as a batch job")
+    arg_parser.add_argument('--batch-latency-s', type=float, default=2.0, help="seconds the mock batch job takes")
+    arg_parser.add_argument('--batch-error-rate', type=float, default=0.0)
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    servers = start_mock_servers(args)
+    vendor_url = f'http://127.0.0.1:{args.vendor_port}'
+    output_directory = tempfile.mkdtemp(prefix='osint_load_test_')
+    extraction_pool = None
+    try:
+        # Vendor pages come through the mock proxy, without the page cache so every URL is downloaded
+        ParserBase.configure_fetcher(proxies={'http': vendor_url}, retries=2, backoff_factor=0.1)
+        ParserBase.configure_extraction(html_backend='auto')
+        if args.extract_processes:
+            extraction_pool = ExtractionPool(processes=args.extract_processes,
+                                             extraction_settings={'html_backend': 'auto'})
+
+        client = AsyncLLMClient(
+            f'http://127.0.0.1:{args.llm_port}', 'load-test', '2024-06-01',
+            tpm_limit=args.client_tpm, rpm_limit=args.client_rpm, max_concurrency=args.llm_concurrency,
+            initial_concurrency=args.llm_initial_concurrency, completion_tokens=150
+        )
+        retry_policy = RetryPolicy(retries=5, base_delay=0.5, max_retry_after=60)
+        prompt_template = scraper.load_prompt(os.path.join(PROJECT_DIR, 'config', 'prompt.txt')) or '{data}'
+        output_sink = create_sink('jsonl', output_directory)
+
+        latencies = []
+        latencies_lock = threading.Lock()
+
+        def finish(job):
+            job = scraper.write_osint_item(job, output_sink)
+            with latencies_lock:
+                latencies.append(time.perf_counter() - job['started'])
+            return job
+
+        def jobs(urls):
+            for url in urls:
+                yield {'url': url, 'started': time.perf_counter()}
+
+        stages = [
+            Stage('fetch', scraper.fetch_article, workers=args.fetch_workers),
+            Stage('extract', lambda job: scraper.extract_article(job, extraction_pool), workers=args.extract_workers)
+        ]
+        extracted_jobs = []
+
+        def collect(job):
+            extracted_jobs.append(job)
+            return job
+
+        if args.batch:
+            stages.append(Stage('collect', collect))
+        else:
+            stages += [
+                Stage('llm', lambda job: scraper.generate_osint_item(job, client, 'mock-deployment', prompt_template,
+                                                                     retry_policy=retry_policy),
+                      workers=args.llm_concurrency),
+                Stage('write', finish)
+            ]
+
+        urls = article_urls(args.urls)
+        started = time.perf_counter()
+        stats = Pipeline(stages, queue_size=args.queue_size).run(jobs(urls))
+        if args.batch:
+            batch_client = AzureOpenAI(azure_endpoint=f'http://127.0.0.1:{args.llm_port}', api_key='load-test',
+                                       api_version='2024-07-01-preview')
+            batch_runner = BatchRunner(batch_client, 'mock-batch-deployment',
+                                       os.path.join(output_directory, 'batches'), poll_interval=0.5)
+            written, failed = scraper.generate_osint_items_in_batch(extracted_jobs, batch_runner, 'mock-deployment',
+                                                                    prompt_template, output_sink)
+            stats['batch'] = {'processed': written, 'dropped': 0, 'failed': failed}
+            finished = time.perf_counter()
+            latencies = [finished - job['started'] for job in extracted_jobs if 'output_path' in job]
+        elapsed = time.perf_counter() - started
+        output_sink.close()
+
+        vendor_stats = read_stats(args.vendor_port)
+        llm_stats = read_stats(args.llm_port)
+        client.close()
+    finally:
+        if extraction_pool:
+            extraction_pool.close()
+        servers.terminate()
+        servers.wait()
+
+    print(f"Processed {len(latencies)}/{len(urls)} URLs in {elapsed:.2f} s: {len(latencies) / elapsed:.1f} URLs/s")
+    if latencies:
+        print("End-to-end latency: " + ', '.join(
+            f"p{int(fraction * 100)} {percentile(latencies, fraction) * 1000:.0f} ms"
+            for fraction in (0.5, 0.9, 0.99)) + f", max {max(latencies) * 1000:.0f} ms")
+    print(f"Pipeline stages: {stats}")
+    print(f"Vendor server: {vendor_stats}")
+    print(f"LLM server: {llm_stats}")
+    print(f"GPT concurrency at the end: {client.concurrency}")
+    print("Stage timings (all parsers):")
+    for name, series in metrics.to_summary()['histograms'].items():
+        count = sum(entry['count'] for entry in series)
+        total = sum(entry['sum'] for entry in series)
+        slowest = max(entry['max'] for entry in series)
+        print(f"  {name:<24} count {count:>6}  mean {total / count * 1000:>8.1f} ms  max {slowest * 1000:>8.1f} ms")
+    metrics.export(json_file=os.path.join(output_directory, 'metrics.json'))
+    print(f"Output and metrics: {output_directory}")
+
+
+if __name__ == '__main__':
+    main()
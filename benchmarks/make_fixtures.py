@@ -0,0 +1,105 @@
+# This file generates the synthetic HTML fixtures of the parser benchmark (benchmarks/fixtures).
+# Every supported site gets a page with the site's article markup, an article body with headers, paragraphs,
+# lists, a table and an unwanted section, and the navigation, scripts and sidebars of a real vendor page.
+# Recorded pages of the live sites can be added next to them with: python benchmarks/parser_bench.py --record URL
+#     python benchmarks/make_fixtures.py
+
+import json
+import os
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+INDEX_PATH = os.path.join(FIXTURES_DIR, 'index.json')
+
+# Number of times the article body is repeated in a page, and of navigation and related links
+BODY_REPEAT = 12
+NAV_LINKS = 120
+RELATED_LINKS = 60
+
+# Article body, {stop} is replaced by a header of the site's unwanted section
+BODY = '''<p>Intro paragraph with <a href="#">a link</a>, <code>cmd.exe</code> and <em>emphasis</em>.</p>
+<h2>Overview</h2>
+<p>The campaign targets <strong>finance</strong> organisations.</p>
+<ul><li>Item one</li><li>Item <b>two</b></li></ul>
+<div class="wrap"><p>Wrapped paragraph inside a div.</p></div>
+<h3>Technical details</h3>
+<table><tbody><tr><th>Stage</th><td>Loader</td></tr><tr><th>Payload</th><td>Stealer</td></tr></tbody></table>
+<ol><li>Step one</li><li>Step two</li></ol>
+<h2>{stop}</h2>
+<p>This text belongs to the unwanted section.</p>
+<ul><li>evil.example.com</li></ul>
+<h2>Conclusion</h2>
+<p>Final thoughts on the threat.</p>
+'''
+
+# Site name: (article URL, article markup with a {body} placeholder, unwanted section header)
+SITES = {
+    'anyrun': ('https://any.run/cybersecurity-blog/x/', '<h1 class="entry-title">Any Title</h1><div class="entry-content__content js-content">{body}</div>', 'IOCs'),
+    'avast': ('https://decoded.avast.io/x/', '<h1 class="entry-title">Avast Title</h1><div class="entry-content entry-single clearfix">{body}</div>', 'Indicators of Compromise'),
+    'bitdefender': ('https://www.bitdefender.com/blog/x/', '<h1 class="tw-text-3xl tw-font-bold md:tw-text-4xl md:tw-leading-tight xl:tw-text-5xl xl:tw-leading-tight">Bd Title</h1><div class="content tw-mb-12 tw-text-lg tw-text-black">{body}</div>', 'Indicators of compromise'),
+    'cadosecurity': ('https://www.cadosecurity.com/blog/x', '<h1 class="title">Cado Title</h1><div class="body">{body}</div>', 'IOCs'),
+    'cisa': ('https://www.cisa.gov/news-events/x', '<main class="c-main"><h1 class="c-page-title__title">Cisa Title</h1><div class="l-full__main">{body}</div></main>', 'Mitigations'),
+    'crowdstrike': ('https://www.crowdstrike.com/blog/x/', '<div class="cmp-wp-headline">Cs Title</div><div class="cmp-text">{body}</div>', 'Indicators of Compromise'),
+    'cyble': ('https://cyble.com/blog/x/', '<main class="site-main" id="main"><div data-id="4402e2e" data-element_type="container"><div data-id="3c220676" data-element_type="widget" data-widget_type="theme-post-title.default"><h1>Cyble Title</h1></div><div data-id="1fcc1d6c" data-element_type="widget" data-widget_type="theme-post-excerpt.default">Cyble excerpt</div><div data-id="2907e1e2" data-element_type="widget" data-widget_type="theme-post-content.default"><div class="elementor-widget-container">{body}</div></div></div></main>', 'Indicators of Compromise (IOCs)'),
+    'elastic': ('https://www.elastic.co/security-labs/x', '<div class="max-w-7xl mx-auto relative z-10 flex flex-col space-y-4"><h1 class="font-bold leading-tighter text-3xl md:text-5xl">El Title</h1><p class="text-zinc-200 text-base md:text-xl">El sub</p></div><div class="prose lg:prose-lg prose-invert w-full article-content">{body}</div>', 'Detection logic'),
+    'github': ('https://github.com/org/repo', '<article class="markdown-body entry-content container-lg">{body}</article>', 'Anything'),
+    'harfanglab': ('https://harfanglab.io/insidethelab/x/', '<h1 class="hero-title">Hl Title</h1><section class="content">{body}<div class="footnotes"><p>Footnote text</p></div></section>', 'Indicators'),
+    'mcafee': ('https://www.mcafee.com/blogs/x/', '<div class="container-fluid p-0"><h1 class="main-heading">Mc Title</h1><div class="the_content">{body}</div></div>', 'Indicators of Compromise'),
+    'microsoft': ('https://www.microsoft.com/en-us/security/blog/x/', '<h1 class="single__title h2 m-0 pt-2">Ms Title</h1><div class="single__content mb-4 pt-4 pt-xl-5 pb-5"><p class="small">Kicker</p>{body}</div>', 'Mitigation and protection guidance'),
+    'recordedfuture': ('https://www.recordedfuture.com/research/x', '<h1 class="page-heading-three">Rf Title</h1><div class="w-full lg:w-8/12">{body}</div>', 'Mitigations'),
+    'securelist': ('https://securelist.com/x/', '<h1 class="c-article__title">Sl Title</h1><div class="c-wysiwyg">{body}<div class="crayon-syntax crayon-theme-classic crayon-font-monaco crayon-os-pc print-yes notranslate"><p>code listing</p></div></div>', 'Indicators of compromise'),
+    'unit42': ('https://unit42.paloaltonetworks.com/x/', '<main class="main"><div class="ab__title"><h1>U42 Title</h1></div><section class="section blog-contents">{body}<div class="be-related-articles"><p>Related</p></div></section></main>', 'Indicators of Compromise'),
+    'welivesecurity': ('https://www.welivesecurity.com/en/x/', '<div class="container article-page py-5"><div class="article-header"><h1 class="page-headline">Wls Title</h1><p class="sub-title">Wls sub</p></div><div class="article-body">{body}<blockquote><div>Quoted statement</div></blockquote></div></div>', 'IoCs'),
+    'wordfence': ('https://www.wordfence.com/blog/x/', '<section class="blog-post-content"><div class="col-12 col-lg-8">{body}<div style="padding: 6px; margin-bottom: 1em; background-color: rgb(242, 242, 242); line-height: 1.4;">Highlighted box</div></div></section>', 'Indicators of Compromise'),
+    'zscaler': ('https://www.zscaler.com/blogs/security-research/x', '<div class="node-blog"><h1>Zs Title</h1>{body}<div class="py-16"><p>Sidebar</p></div></div>', 'Zscaler Coverage'),
+}
+
+# Page chrome around the article, similar to the navigation, scripts and sidebars of the vendor sites
+CHROME_TOP = (
+    '<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title>'
+    '<script>var config = {{"menu": "<p>not text</p>", "items": [' + ', '.join(str(i) for i in range(2000)) + ']}};</script>'
+    '<style>p {{ color: #333; }} .nav li {{ display: inline; }}</style></head>'
+    '<body><nav class="nav"><ul>' + ''.join(f'<li><a href="/n{i}">Nav {i}</a></li>' for i in range(NAV_LINKS)) + '</ul></nav>'
+    '<header><h2>Site header</h2></header>'
+)
+CHROME_BOTTOM = (
+    '<aside><h3>Related</h3><ul>' + ''.join(f'<li><a href="/r{i}">Related post {i}</a></li>' for i in range(RELATED_LINKS)) + '</ul></aside>'
+    '<footer><p>Copyright</p></footer></body></html>'
+)
+
+
+def build_page(name, markup, stop):
+    """
+    Returns:
+        str: The fixture page of a site.
+    """
+    # The article sections are repeated, the unwanted section and the conclusion are kept once at the end
+    sections, unwanted = BODY.split('<h2>{stop}</h2>')
+    body = sections * BODY_REPEAT + f'<h2>{stop}</h2>' + unwanted
+    if name == 'cyble':
+        # Cyble only extracts the content under its wp-block-heading headers, the unclassed one is left out
+        body = body.replace('<h2>', '<h2 class="wp-block-heading">')
+        body += '<h2>Subscribe to our newsletter</h2><p>Newsletter call to action.</p><ul><li>Related post</li></ul>'
+    return CHROME_TOP.format(title=name) + markup.replace('{body}', body) + CHROME_BOTTOM
+
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    index = {}
+    if os.path.exists(INDEX_PATH):
+        with open(INDEX_PATH, 'r', encoding='utf-8') as index_file:
+            index = json.load(index_file)
+
+    for name, (url, markup, stop) in SITES.items():
+        file_name = f'{name}_synthetic.html'
+        with open(os.path.join(FIXTURES_DIR, file_name), 'w', encoding='utf-8') as fixture_file:
+            fixture_file.write(build_page(name, markup, stop))
+        index[file_name] = url
+
+    with open(INDEX_PATH, 'w', encoding='utf-8') as index_file:
+        json.dump(index, index_file, indent=4, sort_keys=True)
+        index_file.write('\n')
+    print(f"Wrote {len(SITES)} fixtures to {FIXTURES_DIR}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,436 @@
+# This file runs local stand-ins for the vendor sites and the Azure OpenAI deployment.
+# The vendor server is an HTTP proxy: requests for http://<vendor domain>/... sent through it are answered with
+# the fixture page of that domain (benchmarks/fixtures), after a configurable latency and with a configurable
+# share of 503 errors. The LLM server answers Azure OpenAI chat completions requests after a latency that grows
+# with the number of generated tokens, and enforces requests- and tokens-per-minute limits with 429 responses
+# and a Retry-After header. It also stands in for the Batch API: uploaded batch input files are answered after a
+# configurable delay into an output file. Both servers report their counters as JSON on GET /_stats.
+#     python benchmarks/mock_servers.py --vendor-port 8081 --llm-port 8082
+
+import argparse
+import collections
+import email.parser
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from parsers.dispatch import url_host  # noqa: E402
+
+FIXTURES_DIR = os.path.join(PROJECT_DIR, 'benchmarks', 'fixtures')
+
+
+def _read_index(fixtures_dir):
+    with open(os.path.join(fixtures_dir, 'index.json'), 'r', encoding='utf-8') as index_file:
+        return json.load(index_file)
+
+
+def article_urls(count, fixtures_dir=FIXTURES_DIR):
+    """
+    Returns:
+        list: count distinct http:// article URLs spread over the fixture domains, served by the vendor proxy.
+    """
+    hosts = sorted({url_host(url) for url in _read_index(fixtures_dir).values()})
+    return [f'http://{hosts[i % len(hosts)]}/benchmark/article-{i}/' for i in range(count)]
+
+
+def estimate_tokens(text):
+    """
+    Returns:
+        int: A rough token count of a text (about 4 characters per token).
+    """
+    return max(1, len(text) // 4)
+
+
+class _MockServer:
+    """
+    Runs a ThreadingHTTPServer in a background thread and keeps its request counters.
+    """
+
+    handler_class = None
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.counters = collections.Counter()
+        self.counters_lock = threading.Lock()
+        handler = type(self.handler_class.__name__, (self.handler_class,), {'mock': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self, name, amount=1):
+        with self.counters_lock:
+            self.counters[name] += amount
+
+    def stats(self):
+        with self.counters_lock:
+            return dict(self.counters)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, data, headers=None):
+        self.send_body(status, json.dumps(data).encode('utf-8'), 'application/json', headers)
+
+    def send_stats(self):
+        self.send_json(200, self.mock.stats())
+
+
+class _VendorHandler(_QuietHandler):
+
+    def do_GET(self):
+        # Requests sent through a proxy carry the absolute URL, direct requests only the path
+        host = url_host(self.path) or self.headers.get('Host', '').split(':')[0].lower()
+        if urlparse(self.path).path == '/_stats' and not url_host(self.path):
+            self.send_stats()
+            return
+
+        mock = self.mock
+        mock.count('requests')
+        time.sleep(max(0.0, random.gauss(mock.latency, mock.jitter)))
+
+        if random.random() < mock.error_rate:
+            mock.count('errors')
+            headers = {'Retry-After': str(mock.retry_after)} if mock.retry_after is not None else None
+            self.send_body(503, b'Service Unavailable', 'text/plain', headers)
+            return
+
+        page = mock.page_for_host(host)
+        if page is None:
+            mock.count('not_found')
+            self.send_body(404, b'Not Found', 'text/plain')
+            return
+
+        mock.count('bytes', len(page))
+        self.send_body(200, page, 'text/html; charset=utf-8')
+
+
+class MockVendorServer(_MockServer):
+    """
+    HTTP proxy that serves the fixture page of a vendor domain for any URL of that domain.
+
+    Parameters:
+        fixtures_dir (str): Folder with the fixture pages and their index.json.
+        latency (float): Mean response latency in seconds.
+        jitter (float): Standard deviation of the latency in seconds.
+        error_rate (float): Share of requests answered with 503 (0 to 1).
+        retry_after (int): Seconds sent in the Retry-After header of the 503 answers, None for no header.
+        host (str), port (int): Listening address. Port 0 picks a free port.
+    """
+
+    handler_class = _VendorHandler
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=0.05, jitter=0.02, error_rate=0.0, retry_after=None,
+                 host='127.0.0.1', port=0):
+        super().__init__(host, port)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+
+        self.pages = {}
+        for file_name, url in sorted(_read_index(fixtures_dir).items()):
+            with open(os.path.join(fixtures_dir, file_name), 'rb') as fixture_file:
+                self.pages.setdefault(url_host(url), fixture_file.read())
+
+    def page_for_host(self, host):
+        """
+        Returns:
+            bytes: The fixture page of the host or of its closest parent domain, or None.
+        """
+        labels = host.split('.')
+        for start in range(len(labels) - 1):
+            page = self.pages.get('.'.join(labels[start:]))
+            if page is not None:
+                return page
+        return None
+
+
+def _completion(request, completion_tokens):
+    """
+    Returns:
+        dict: A chat completion answering a chat completions request, in the "key: value" lines format the scraper
+            parses into an Osint item.
+    """
+    prompt = ''.join(message.get('content') or '' for message in request.get('messages', []))
+    prompt_tokens = estimate_tokens(prompt)
+    first_line = next((line for line in prompt.splitlines() if line.strip() and not line.startswith('Given')), '')
+    content = f'title: {first_line.strip()[:80]}\nsummary: Mock summary of {len(prompt)} prompt characters.'
+    return {
+        'id': f'chatcmpl-{uuid.uuid4().hex}',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': request.get('model') or 'mock',
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                  'total_tokens': prompt_tokens + completion_tokens}
+    }
+
+
+_NOT_FOUND = {'error': {'code': '404', 'message': 'Resource not found'}}
+
+
+class _LLMHandler(_QuietHandler):
+
+    def do_GET(self):
+        path = urlparse(self.path).path.rstrip('/')
+        parts = path.split('/')
+        mock = self.mock
+        if path == '/_stats':
+            self.send_stats()
+        elif path.startswith('/openai/files/') and path.endswith('/content') and parts[3] in mock.files:
+            self.send_body(200, mock.files[parts[3]]['content'], 'application/octet-stream')
+        elif path.startswith('/openai/files/') and parts[3] in mock.files:
+            self.send_json(200, mock.files[parts[3]]['object'])
+        elif path.startswith('/openai/batches/') and parts[3] in mock.batches:
+            self.send_json(200, mock.batches[parts[3]])
+        else:
+            self.send_json(404, _NOT_FOUND)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def do_POST(self):
+        mock = self.mock
+        path = urlparse(self.path).path.rstrip('/')
+        if path == '/openai/files':
+            self.upload_file()
+            return
+
+        try:
+            request = json.loads(self.read_body() or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': {'code': '400', 'message': 'Invalid JSON body'}})
+            return
+
+        if path == '/openai/batches':
+            batch = mock.create_batch(request)
+            if batch is None:
+                self.send_json(400, {'error': {'code': '400', 'message': 'Unknown input file'}})
+            else:
+                self.send_json(200, batch)
+            return
+        if not path.endswith('/chat/completions'):
+            self.send_json(404, _NOT_FOUND)
+            return
+
+        mock.count('requests')
+        answer = _completion(request, mock.completion_tokens)
+        prompt_tokens = answer['usage']['prompt_tokens']
+        completion_tokens = mock.completion_tokens
+
+        retry_after = mock.admit(prompt_tokens + completion_tokens)
+        if retry_after is not None:
+            mock.count('throttled')
+            self.send_json(429, {'error': {'code': '429', 'message': 'Rate limit is exceeded. Try again later.'}},
+                           headers={'Retry-After': str(max(1, round(retry_after))),
+                                    'retry-after-ms': str(int(retry_after * 1000))})
+            return
+
+        time.sleep(mock.latency + completion_tokens / mock.tokens_per_second)
+        mock.count('prompt_tokens', prompt_tokens)
+        mock.count('completion_tokens', completion_tokens)
+        self.send_json(200, answer)
+
+    def upload_file(self):
+        # multipart/form-data body with the purpose and file fields
+        message = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode('latin-1') + self.read_body())
+        fields = {}
+        for part in message.get_payload() if message.is_multipart() else []:
+            fields[part.get_param('name', header='content-disposition')] = (
+                part.get_filename(), part.get_payload(decode=True))
+        if 'file' not in fields:
+            self.send_json(400, {'error': {'code': '400', 'message': 'No file uploaded'}})
+            return
+        file_name, content = fields['file']
+        purpose = (fields.get('purpose') or (None, b'batch'))[1].decode('utf-8')
+        self.send_json(200, self.mock.add_file(file_name or 'upload.jsonl', content, purpose))
+
+
+class MockLLMServer(_MockServer):
+    """
+    Fake Azure OpenAI chat completions endpoint with latency and rate limits.
+
+    Parameters:
+        latency (float): Fixed latency of a response in seconds (time to first token).
+        tokens_per_second (float): Generation speed; completion_tokens / tokens_per_second is added to the latency.
+        completion_tokens (int): Number of tokens of every generated answer.
+        rpm_limit (int): Requests allowed per minute, 0 for no limit.
+        tpm_limit (int): Tokens (prompt + completion) allowed per minute, 0 for no limit.
+        batch_latency (float): Seconds a batch job takes before its output file is ready.
+        batch_error_rate (float): Share of the requests of a batch job answered with an error (0 to 1).
+        host (str), port (int): Listening address. Port 0 picks a free port.
+    """
+
+    handler_class = _LLMHandler
+
+    def __init__(self, latency=0.3, tokens_per_second=80, completion_tokens=150, rpm_limit=0, tpm_limit=0,
+                 batch_latency=2.0, batch_error_rate=0.0, host='127.0.0.1', port=0):
+        super().__init__(host, port)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.window = collections.deque()  # (time, tokens) of the requests admitted in the last minute
+        self.window_lock = threading.Lock()
+        self.batch_latency = batch_latency
+        self.batch_error_rate = batch_error_rate
+        self.files = {}    # Uploaded and generated files by id: {'object': file object, 'content': bytes}
+        self.batches = {}  # Batch objects by id
+
+    def add_file(self, file_name, content, purpose):
+        """
+        Returns:
+            dict: The file object of the stored file.
+        """
+        file_object = {
+            'id': f'file-{uuid.uuid4().hex}', 'object': 'file', 'bytes': len(content), 'created_at': int(time.time()),
+            'filename': file_name, 'purpose': purpose, 'status': 'processed'
+        }
+        self.files[file_object['id']] = {'object': file_object, 'content': content}
+        self.count('files')
+        return file_object
+
+    def create_batch(self, request):
+        """
+        Creates a batch job from an uploaded input file and runs it in the background.
+
+        Returns:
+            dict: The batch object, or None if the input file does not exist.
+        """
+        input_file = self.files.get(request.get('input_file_id'))
+        if input_file is None:
+            return None
+        lines = [json.loads(line) for line in input_file['content'].decode('utf-8').splitlines() if line.strip()]
+        batch = {
+            'id': f'batch_{uuid.uuid4().hex}', 'object': 'batch', 'endpoint': request.get('endpoint'),
+            'input_file_id': request['input_file_id'], 'completion_window': request.get('completion_window', '24h'),
+            'status': 'validating', 'created_at': int(time.time()), 'output_file_id': None, 'error_file_id': None,
+            'request_counts': {'total': len(lines), 'completed': 0, 'failed': 0}
+        }
+        self.batches[batch['id']] = batch
+        self.count('batches')
+        threading.Thread(target=self._run_batch, args=(batch, lines), daemon=True).start()
+        return batch
+
+    def _run_batch(self, batch, lines):
+        batch['status'] = 'in_progress'
+        time.sleep(self.batch_latency)
+
+        outputs, errors = [], []
+        for line in lines:
+            record = {'id': f'batch_req_{uuid.uuid4().hex}', 'custom_id': line.get('custom_id')}
+            if random.random() < self.batch_error_rate:
+                record['response'] = {'status_code': 500, 'body': {'error': {'code': 'server_error',
+                                                                              'message': 'Mock batch error'}}}
+                record['error'] = None
+                errors.append(record)
+                continue
+            answer = _completion(line.get('body') or {}, self.completion_tokens)
+            record['response'] = {'status_code': 200, 'request_id': uuid.uuid4().hex, 'body': answer}
+            record['error'] = None
+            outputs.append(record)
+            self.count('batch_requests')
+
+        def to_file(records, suffix):
+            content = ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+            return self.add_file(f"{batch['id']}_{suffix}.jsonl", content, 'batch_output')['id']
+
+        batch['output_file_id'] = to_file(outputs, 'output') if outputs else None
+        batch['error_file_id'] = to_file(errors, 'error') if errors else None
+        batch['request_counts'] = {'total': len(lines), 'completed': len(outputs), 'failed': len(errors)}
+        batch['status'] = 'completed'
+
+    def admit(self, tokens):
+        """
+        Admits a request into the one-minute sliding window.
+
+        Returns:
+            float: None if the request is admitted, else the seconds until it would fit in the limits.
+        """
+        now = time.monotonic()
+        with self.window_lock:
+            while self.window and now - self.window[0][0] >= 60:
+                self.window.popleft()
+
+            used_tokens = sum(window_tokens for _, window_tokens in self.window)
+            over_requests = self.rpm_limit and len(self.window) + 1 > self.rpm_limit
+            over_tokens = self.tpm_limit and used_tokens + tokens > self.tpm_limit
+            if over_requests or over_tokens:
+                return 60 - (now - self.window[0][0]) if self.window else 1.0
+
+            self.window.append((now, tokens))
+            return None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run the mock vendor sites and Azure OpenAI endpoint.")
+    arg_parser.add_argument('--vendor-port', type=int, default=8081)
+    arg_parser.add_argument('--llm-port', type=int, default=8082)
+    arg_parser.add_argument('--vendor-latency-ms', type=float, default=50)
+    arg_parser.add_argument('--vendor-jitter-ms', type=float, default=20)
+    arg_parser.add_argument('--vendor-error-rate', type=float, default=0.0)
+    arg_parser.add_argument('--llm-latency-ms', type=float, default=300)
+    arg_parser.add_argument('--llm-tokens-per-second', type=float, default=80)
+    arg_parser.add_argument('--llm-completion-tokens', type=int, default=150)
+    arg_parser.add_argument('--llm-rpm', type=int, default=0, help="requests per minute limit (0 = none)")
+    arg_parser.add_argument('--llm-tpm', type=int, default=0, help="tokens per minute limit (0 = none)")
+    arg_parser.add_argument('--batch-latency-s', type=float, default=2.0, help="seconds a batch job takes")
+    arg_parser.add_argument('--batch-error-rate', type=float, default=0.0)
+    args = arg_parser.parse_args()
+
+    vendor = MockVendorServer(latency=args.vendor_latency_ms / 1000, jitter=args.vendor_jitter_ms / 1000,
+                              error_rate=args.vendor_error_rate, port=args.vendor_port).start()
+    llm = MockLLMServer(latency=args.llm_latency_ms / 1000, tokens_per_second=args.llm_tokens_per_second,
+                        completion_tokens=args.llm_completion_tokens, rpm_limit=args.llm_rpm, tpm_limit=args.llm_tpm,
+                        batch_latency=args.batch_latency_s, batch_error_rate=args.batch_error_rate,
+                        port=args.llm_port).start()
+    print(f"Vendor sites proxy: {vendor.url}", flush=True)
+    print(f"Azure OpenAI endpoint: {llm.url}", flush=True)
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        vendor.stop()
+        llm.stop()
+
+
+if __name__ == '__main__':
+    main()
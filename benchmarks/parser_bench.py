@@ -0,0 +1,204 @@
+# This file benchmarks the parsers offline over the stored HTML fixtures (benchmarks/fixtures).
+# For every parser it reports the extraction time percentiles, the split between building the HTML tree and
+# walking it, the peak memory of one extraction and the size of the extracted text. Save a run with --json
+# and pass it to a later run with --baseline to compare the medians before and after a change.
+#     python benchmarks/parser_bench.py --runs 50 --backend lxml
+#     python benchmarks/parser_bench.py --record https://securelist.com/some-article/
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from parsers import find_parser, load_all_parsers  # noqa: E402
+from parsers.parser_base import ParserBase  # noqa: E402
+
+FIXTURES_DIR = os.path.join(PROJECT_DIR, 'benchmarks', 'fixtures')
+INDEX_PATH = os.path.join(FIXTURES_DIR, 'index.json')
+
+
+def percentile(values, fraction):
+    """
+    Returns:
+        float: The nearest-rank percentile of the values (fraction between 0 and 1).
+    """
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def load_fixtures(parser_filter=None):
+    """
+    Reads the fixture pages listed in the fixtures index.
+
+    Parameters:
+        parser_filter (str): Only keep the fixtures handled by parsers whose class name contains this text.
+
+    Returns:
+        list: (parser, file name, URL, raw HTML) of every fixture.
+    """
+    with open(INDEX_PATH, 'r', encoding='utf-8') as index_file:
+        index = json.load(index_file)
+
+    fixtures = []
+    for file_name, url in sorted(index.items()):
+        parser = find_parser(url)
+        if parser is None:
+            logging.warning(f"No parser found for fixture {file_name} ({url})")
+            continue
+        if parser_filter and parser_filter.lower() not in type(parser).__name__.lower():
+            continue
+        with open(os.path.join(FIXTURES_DIR, file_name), 'rb') as fixture_file:
+            fixtures.append((parser, file_name, url, fixture_file.read()))
+    return fixtures
+
+
+def benchmark_fixture(parser, url, html, runs, backend):
+    """
+    Extracts one fixture repeatedly.
+
+    Returns:
+        dict: Per-run total, tree build and traversal times in seconds, the peak memory of one extraction
+            in bytes and the size of the extracted text.
+    """
+    # Warm-up run, also the extracted text
+    text = parser.extract_with_backend(html, url, backend)
+
+    totals, tree_builds, traversals = [], [], []
+    for _ in range(runs):
+        timings = {}
+        started = time.perf_counter()
+        parser.extract_with_backend(html, url, backend, timings)
+        totals.append(time.perf_counter() - started)
+        tree_builds.append(timings.get('tree_build', 0.0))
+        traversals.append(timings.get('traversal', 0.0))
+
+    # Peak memory is measured on a separate run, tracemalloc slows down the extraction
+    tracemalloc.start()
+    parser.extract_with_backend(html, url, backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'totals': totals,
+        'tree_builds': tree_builds,
+        'traversals': traversals,
+        'peak_bytes': peak,
+        'html_bytes': len(html),
+        'text_chars': len(text)
+    }
+
+
+def summarize(results):
+    """
+    Aggregates the fixture results of one parser.
+
+    Returns:
+        dict: Time percentiles in milliseconds, tree build share, peak memory in KB and output size.
+    """
+    totals = [value for result in results for value in result['totals']]
+    tree_build = sum(value for result in results for value in result['tree_builds'])
+    traversal = sum(value for result in results for value in result['traversals'])
+    return {
+        'fixtures': len(results),
+        'p50_ms': percentile(totals, 0.50) * 1000,
+        'p90_ms': percentile(totals, 0.90) * 1000,
+        'p99_ms': percentile(totals, 0.99) * 1000,
+        'tree_build_pct': 100 * tree_build / (tree_build + traversal) if tree_build + traversal else 0.0,
+        'peak_kb': max(result['peak_bytes'] for result in results) / 1024,
+        'html_kb': sum(result['html_bytes'] for result in results) / 1024,
+        'text_chars': sum(result['text_chars'] for result in results)
+    }
+
+
+def print_report(summaries, baseline=None):
+    print(f"{'parser':<24}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'build %':>9}{'peak KB':>10}{'html KB':>9}{'chars':>8}"
+          + (f"{'p50 vs base':>13}" if baseline else ''))
+    for name, summary in sorted(summaries.items()):
+        line = (f"{name:<24}{summary['p50_ms']:>9.2f}{summary['p90_ms']:>9.2f}{summary['p99_ms']:>9.2f}"
+                f"{summary['tree_build_pct']:>9.1f}{summary['peak_kb']:>10.0f}{summary['html_kb']:>9.0f}"
+                f"{summary['text_chars']:>8}")
+        if baseline:
+            before = baseline.get(name)
+            line += f"{(summary['p50_ms'] / before['p50_ms'] - 1) * 100:>+12.1f}%" if before else f"{'-':>13}"
+        print(line)
+
+
+def record_fixtures(urls):
+    """
+    Downloads live pages with their parsers and stores them as fixtures.
+
+    Parameters:
+        urls (list): Article URLs of supported sites.
+    """
+    with open(INDEX_PATH, 'r', encoding='utf-8') as index_file:
+        index = json.load(index_file)
+
+    for url in urls:
+        parser = find_parser(url)
+        if parser is None:
+            logging.warning(f"No parser found for URL: {url}")
+            continue
+        html = parser.fetch(url)
+        site = type(parser).__module__.rsplit('.', 1)[-1].replace('_parser', '')
+        slug = re.sub(r'[^a-z0-9]+', '-', url.split('://', 1)[-1].lower()).strip('-')[:60]
+        file_name = f'{site}_{slug}.html'
+        with open(os.path.join(FIXTURES_DIR, file_name), 'wb') as fixture_file:
+            fixture_file.write(html)
+        index[file_name] = url
+        print(f"Recorded {url} as {file_name} ({len(html) // 1024} KB)")
+
+    with open(INDEX_PATH, 'w', encoding='utf-8') as index_file:
+        json.dump(index, index_file, indent=4, sort_keys=True)
+        index_file.write('\n')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the parsers over the stored HTML fixtures.")
+    arg_parser.add_argument('--runs', type=int, default=20, help="extractions of every fixture")
+    arg_parser.add_argument('--backend', default='auto', help="HTML tree builder: auto, lxml or html.parser")
+    arg_parser.add_argument('--full-parse', action='store_true', help="parse the full pages instead of the article subtrees")
+    arg_parser.add_argument('--parser', help="only benchmark parsers whose class name contains this text")
+    arg_parser.add_argument('--json', help="save the results to this file")
+    arg_parser.add_argument('--baseline', help="compare the medians with results saved by --json")
+    arg_parser.add_argument('--record', nargs='+', metavar='URL', help="download live pages as new fixtures and exit")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    if args.record:
+        record_fixtures(args.record)
+        return
+
+    load_all_parsers()
+    ParserBase.configure_extraction(partial_parse=not args.full_parse, html_backend=args.backend)
+    backend = ParserBase.html_backend
+
+    results = {}
+    for parser, file_name, url, html in load_fixtures(args.parser):
+        results.setdefault(type(parser).__name__, []).append(benchmark_fixture(parser, url, html, args.runs, backend))
+    summaries = {name: summarize(parser_results) for name, parser_results in results.items()}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['parsers']
+
+    print(f"Backend: {backend}, {'full' if args.full_parse else 'partial'} parse, {args.runs} runs per fixture")
+    print_report(summaries, baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump({'backend': backend, 'full_parse': args.full_parse, 'runs': args.runs, 'parsers': summaries},
+                      json_file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
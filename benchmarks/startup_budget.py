@@ -0,0 +1,76 @@
+# This file checks the startup import time of the scraper against a budget.
+# It runs a fresh interpreter with -X importtime, sums the cumulative time of the top-level imports of the
+# project packages (which includes the third-party modules they import) and fails when the total exceeds the
+# budget. Interpreter startup imports such as site are not counted. Run it from the project root:
+#     python benchmarks/startup_budget.py --budget-ms 250
+
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages of the project whose import time is counted
+PROJECT_PACKAGES = ('parsers', 'utils')
+
+# Startup scenarios: importing the parsers and dispatching one URL (lazy loading), and importing every parser
+SCENARIOS = {
+    'lazy': "import parsers; parsers.find_parser('https://www.microsoft.com/en-us/security/blog/')",
+    'eager': "import parsers; parsers.load_all_parsers()",
+}
+
+
+def measure_imports(code):
+    """
+    Runs code in a fresh interpreter with -X importtime.
+
+    Parameters:
+        code (str): Python code to run.
+
+    Returns:
+        list: (cumulative microseconds, module name) of every top-level import of a project package, slowest first.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+
+    imports = []
+    for line in result.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package", nested imports are indented
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        if name.startswith(' ') and not name.startswith('  '):
+            name = name.strip()
+            if name.split('.')[0] in PROJECT_PACKAGES:
+                imports.append((int(cumulative), name))
+    return sorted(imports, reverse=True)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Check the startup import time against a budget.")
+    arg_parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='lazy', help="startup scenario to measure")
+    arg_parser.add_argument('--budget-ms', type=float, default=250, help="maximum total import time in milliseconds")
+    arg_parser.add_argument('--runs', type=int, default=5, help="number of runs, the fastest one is checked")
+    arg_parser.add_argument('--top', type=int, default=10, help="number of slowest imports to print")
+    args = arg_parser.parse_args()
+
+    # The fastest run is the least disturbed by other processes and a cold file cache
+    runs = [measure_imports(SCENARIOS[args.scenario]) for _ in range(args.runs)]
+    imports = min(runs, key=lambda run: sum(cumulative for cumulative, _ in run))
+    total_ms = sum(cumulative for cumulative, _ in imports) / 1000
+
+    print(f"Slowest top-level imports ({args.scenario}):")
+    for cumulative, name in imports[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    print(f"Total import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if total_ms > args.budget_ms:
+        print("Startup import time is over budget.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,28 @@
 from openai import AzureOpenAI
 import httpx
 import requests
+import argparse
 import datetime
-import json
 import os
 import re
+import time
 import logging
 import yaml
-from parsers import parser_registry
+from parsers import find_parser
+from parsers.parser_base import ParserBase
+from parsers.extraction_pool import ExtractionPool
+from utils.pipeline import Pipeline, Stage, run_sequentially
+from utils.llm_cache import LLMResponseCache, make_cache_key
+from utils.output_writer import create_sink
+from utils.metrics import metrics
+from utils.robots_cache import RobotsCache
+from utils.scheduler import DomainScheduler
+from utils.llm_client import classify_llm_error
+from utils.llm_router import LLMRouter
+from utils.llm_batch import BatchRunner
+from utils.resilience import RetryPolicy, CircuitBreaker, call_with_retries
+from utils.state_store import (StateStore, content_hash, STATUS_DONE, STATUS_NO_PARSER, STATUS_NOT_ALLOWED,
+                               STATUS_FETCH_FAILED, STATUS_EXTRACT_FAILED, STATUS_LLM_FAILED)
 
 # Load files from the configuration folder
 def load_config(config_file_path):
@@ -35,12 +50,9 @@ def read_links_from_file(file_path):
         logging.error(f"Error reading links from file: {e}")
         return []
 
-# Find a parser that can handle the given URL
+# Find a parser that can handle the given URL (longest matching domain wins)
 def find_parser_for_url(url):
-    for parser in parser_registry:
-        if parser.can_handle(url):
-            return parser
-    return None
+    return find_parser(url)
 
 # Load the prompt template from a text file
 def load_prompt(prompt_file_path):
@@ -62,8 +74,254 @@ def load_gpt_api(gpt_file_path):
         logging.error(f"Error reading GPT API key from file: {e}")
         return ""
 
+# Record the processing state of a URL when a state store is used
+def record_state(state_store, url, **fields):
+    if state_store:
+        state_store.record(url, **fields)
+
+# Download the raw HTML of a job's URL (using relevant parser)
+# With an access check, URLs not allowed by robots.txt or not answering with an HTML page are dropped
+# With a scheduler, the download waits until it fits in the request budget of the site
+def fetch_article(job, state_store=None, access_check=None, scheduler=None):
+    curr_link = job['url']
+    logging.info(f"Processing URL: {curr_link}")
+    parser = find_parser_for_url(curr_link)
+    if not parser:
+        logging.warning(f"No parser found for URL: {curr_link}")
+        record_state(state_store, curr_link, status=STATUS_NO_PARSER)
+        return None
+
+    try:
+        # A site failing repeatedly is not waited for (see resilience.py)
+        parser.fetcher.check_circuit(curr_link)
+        if scheduler:
+            scheduler.wait(curr_link)
+
+        if access_check:
+            # The page downloaded by the access check is the parser input, it is not downloaded twice.
+            # Download errors are raised and recorded as fetch failures, None means robots.txt disallows the URL
+            response = access_check(curr_link, parser.get)
+            if response is None:
+                record_state(state_store, curr_link, status=STATUS_NOT_ALLOWED)
+                return None
+            job['html'] = response.content
+        else:
+            job['html'] = parser.fetch(curr_link)
+    except Exception as e:
+        parser.handle_error(e)
+        record_state(state_store, curr_link, status=STATUS_FETCH_FAILED)
+        return None
+
+    record_state(state_store, curr_link, last_fetch=time.time())
+    job['parser'] = parser
+    return job
+
+# Extract the article text from the downloaded HTML of a job
+# (in a worker process when an extraction pool is given)
+# With a state store, articles whose text did not change since their item was written are skipped
+def extract_article(job, extraction_pool=None, state_store=None, force=False):
+    curr_link = job['url']
+    parser = job['parser']
+    try:
+        if extraction_pool:
+            data = extraction_pool.extract(parser, job.pop('html'), curr_link)
+        else:
+            data = parser.extract(job.pop('html'), curr_link)
+    except Exception as e:
+        parser.handle_error(e)
+        record_state(state_store, curr_link, status=STATUS_EXTRACT_FAILED)
+        return None
+
+    if not data:
+        logging.warning(f"No data returned from {curr_link}")
+        record_state(state_store, curr_link, status=STATUS_EXTRACT_FAILED)
+        return None
+
+    if state_store:
+        data_hash = content_hash(data)
+        previous = state_store.get(curr_link)
+        if not force and previous and previous['status'] == STATUS_DONE and previous['content_hash'] == data_hash:
+            logging.info(f"Article text unchanged since the last run, skipping: {curr_link}")
+            return None
+        # The hash is stored with the done status once the item is written, so an article whose item is
+        # never written is not taken for unchanged on the next run
+        job['content_hash'] = data_hash
+
+    job['data'] = data
+    return job
+
+# Build the Osint item from the GPT response text
+def build_osint_item(final_content, curr_link):
+    # Setting 'createdDate' field
+    now = datetime.datetime.now()
+    item_formatted_datetime = now.strftime("%Y-%m-%dT%H:%M:%S")
+
+    # Osint item structure - Parsing format for json file
+    extracted_data = {
+            "title": "",
+            "summary": """""",
+            "createdDate": item_formatted_datetime,
+            "source": curr_link
+            # Add more fields as you wish
+    }
+
+    for line in final_content.strip().split('\n'):
+        if ': ' in line:  # Ensure there's a key-value format in the line
+            key, value = line.split(': ', 1)
+            key = key.strip()
+            value = value.strip()
+            value = value.strip('"')  # Remove extra quotes from value
+            if key in extracted_data:  # Make sure it's a valid key
+                if value:  # Check if the value is not empty
+                    if isinstance(extracted_data[key], list):
+                        # Handle list values
+                        extracted_data[key] = value.split(', ')
+                    else:
+                        # Handle non-list values
+                        extracted_data[key] = value
+
+    # Empty fields handling
+    must_fields = ["title", "summary", "createdDate", "source"]
+
+    for field in must_fields:
+        # Retrieve the field value (could be None if the field does not exist)
+        field_value = extracted_data.get(field, "")
+        # Check if the field value is empty
+        if not field_value:
+            print(f"Field '{field}' is empty. Can't proceed with item creation. article link: {curr_link}")
+            break
+
+    return extracted_data
+
+# Take the article text of a job to GPT with the prompt and build its Osint item
+# (the GPT response is reused from the response cache when the same request was already answered)
+# Transient failures are retried according to retry_policy, and GPT stops being called for a while
+# when a circuit breaker is given and the requests keep failing
+def generate_osint_item(job, client, gpt_model, prompt_template, llm_cache=None, api_version=None, state_store=None,
+                        retry_policy=None, breaker=None):
+    curr_link = job['url']
+    labels = job['parser'].metric_labels(curr_link)
+
+    # Prepare the prompt by inserting the article data
+    with metrics.timer('prompt_render_seconds', **labels):
+        prompt_w_article_text = prompt_template.format(data=job['data'])
+
+    cache_key = None
+    if llm_cache:
+        cache_key = make_cache_key(gpt_model, api_version, prompt_w_article_text, job['data'])
+        final_content = llm_cache.get(cache_key)
+        if final_content is not None:
+            logging.info(f"Using cached GPT response for {curr_link}")
+            metrics.increment('llm_cache_hits_total', model=gpt_model, **labels)
+            job['item'] = build_osint_item(final_content, curr_link)
+            return job
+
+    def request_completion():
+        with metrics.timer('llm_seconds', model=gpt_model, **labels):
+            return client.create(
+                model = gpt_model, 
+                messages=[
+                    {"role": "user", "content": prompt_w_article_text}
+                ]
+            )
+
+    # Call the GPT API
+    try:
+        GPT_RES = call_with_retries(request_completion, retry_policy or RetryPolicy(retries=0), classify_llm_error,
+                                    key=gpt_model, breaker=breaker, description=f"GPT request for {curr_link}")
+        if GPT_RES.usage:
+            metrics.increment('llm_prompt_tokens_total', GPT_RES.usage.prompt_tokens, model=gpt_model, **labels)
+            metrics.increment('llm_completion_tokens_total', GPT_RES.usage.completion_tokens, model=gpt_model, **labels)
+
+        # Extract and parse the content
+        final_content = GPT_RES.choices[0].message.content
+        if llm_cache and final_content:
+            llm_cache.put(cache_key, final_content)
+        job['item'] = build_osint_item(final_content, curr_link)
+        return job
+
+    except Exception as e:
+        logging.error(f"Error calling GPT API for {curr_link}: {e}")
+        metrics.increment('llm_errors_total', model=gpt_model, **labels)
+        record_state(state_store, curr_link, status=STATUS_LLM_FAILED)
+        return None
+
+# Write the Osint item of a job to the output sink
+# Once the item is synced to disk, the URL is recorded as done together with the hash of the article text the
+# item was made from (a crash before that leaves the URL to be processed again by the next run)
+def write_osint_item(job, output_sink, state_store=None):
+    curr_link = job['url']
+    fields = {'status': STATUS_DONE}
+    if 'content_hash' in job:
+        fields['content_hash'] = job['content_hash']
+
+    def mark_done(file_path):
+        record_state(state_store, curr_link, output_path=file_path, **fields)
+
+    with metrics.timer('write_seconds', **job['parser'].metric_labels(curr_link)):
+        file_path = output_sink.write(job['item'], on_durable=mark_done)
+
+    job['output_path'] = file_path
+    return job
+
+# Send the prompts of extracted jobs to GPT as batch jobs and write the Osint items of the answers
+# (answers found in the response cache are written without being sent again)
+# Returns the number of items written and the number of jobs without an answer
+def generate_osint_items_in_batch(jobs, batch_runner, gpt_model, prompt_template, output_sink, llm_cache=None,
+                                  api_version=None, state_store=None):
+    written = 0
+    prompts = {}
+    pending = {}
+    for index, job in enumerate(jobs):
+        with metrics.timer('prompt_render_seconds', **job['parser'].metric_labels(job['url'])):
+            prompt_w_article_text = prompt_template.format(data=job['data'])
+
+        cache_key = None
+        if llm_cache:
+            cache_key = make_cache_key(gpt_model, api_version, prompt_w_article_text, job['data'])
+            final_content = llm_cache.get(cache_key)
+            if final_content is not None:
+                metrics.increment('llm_cache_hits_total', model=gpt_model, **job['parser'].metric_labels(job['url']))
+                job['item'] = build_osint_item(final_content, job['url'])
+                write_osint_item(job, output_sink, state_store)
+                written += 1
+                continue
+
+        custom_id = str(index)
+        prompts[custom_id] = prompt_w_article_text
+        pending[custom_id] = (job, cache_key)
+
+    if not prompts:
+        return written, 0
+
+    # The answers are matched to their URLs by the custom_id of their request
+    results = batch_runner.run(prompts, name=f"osint_batch_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    failed = 0
+    for custom_id, (job, cache_key) in pending.items():
+        final_content = results.get(custom_id)
+        if not final_content:
+            logging.error(f"No GPT answer in the batch for {job['url']}")
+            metrics.increment('llm_errors_total', model=gpt_model, **job['parser'].metric_labels(job['url']))
+            record_state(state_store, job['url'], status=STATUS_LLM_FAILED)
+            failed += 1
+            continue
+        if llm_cache:
+            llm_cache.put(cache_key, final_content)
+        job['item'] = build_osint_item(final_content, job['url'])
+        write_osint_item(job, output_sink, state_store)
+        written += 1
+    return written, failed
+
 def main():
-    
+
+    # Command line options
+    arg_parser = argparse.ArgumentParser(description="Scrape the articles listed in urls.txt into Osint items.")
+    arg_parser.add_argument('--force', action='store_true',
+                            help="process every URL again, including the ones already processed in earlier runs")
+    arg_parser.add_argument('--batch', action='store_true',
+                            help="send the GPT requests as Azure OpenAI batch jobs (for large backfills)")
+    args = arg_parser.parse_args()
+
     # Set up logging
     logging.basicConfig(
         level=logging.INFO,
@@ -105,6 +363,36 @@ def main():
         logging.error("GPT API key is empty. Ends program.")
         return
 
+    # Set up the shared HTTP fetch service used by the parsers
+    http_config = dict(config.get('http') or {})
+    if http_config.get('cache_dir'):
+        http_config['cache_dir'] = os.path.join(os.path.dirname(__file__), http_config['cache_dir'])
+    ParserBase.configure_fetcher(**http_config)
+
+    # Set up how the parsers build the HTML tree
+    extraction_config = config.get('extraction') or {}
+    ParserBase.configure_extraction(**extraction_config)
+
+    # Get the pipeline settings from configuration
+    pipeline_config = config.get('pipeline') or {}
+
+    # Check robots.txt before downloading each article; the page downloaded by the check is the parser input
+    # robots.txt is read for the user agent the pages are downloaded with
+    fetch_user_agent = ParserBase.fetcher.session.headers.get('User-Agent')
+    robots_cache = None
+    access_check = None
+    if (config.get('access_check') or {}).get('enabled', False):
+        from utils.access_checker import check_and_fetch, robots_cache
+        access_check = lambda url, fetch: check_and_fetch(url, fetch_user_agent, fetch, raise_errors=True)
+
+    # Per-site request budgets (default rate, per-domain rates and robots.txt Crawl-delay / Request-rate)
+    scheduler = None
+    politeness_config = dict(config.get('politeness') or {})
+    if politeness_config.pop('enabled', False):
+        if politeness_config.pop('use_robots', True):
+            politeness_config['robots_cache'] = robots_cache or RobotsCache()
+        scheduler = DomainScheduler(user_agent=fetch_user_agent, **politeness_config)
+
     # Path to user's home directory
     home_directory = os.path.expanduser('~')
     urls_filename = "urls.txt"
@@ -119,101 +407,157 @@ def main():
         logging.info("No links found to process.")
         return
 
+    # Per-URL state of earlier runs: URLs whose Osint item was already written are skipped unless --force is given,
+    # or re-fetched and skipped if their article text did not change when recheck_done is set
+    state_store = None
+    state_config = config.get('state') or {}
+    if state_config.get('enabled', False):
+        state_path = os.path.join(os.path.dirname(__file__), state_config.get('path', 'cache/state.sqlite3'))
+        state_store = StateStore(state_path)
+        if not args.force and not state_config.get('recheck_done', False):
+            done_urls = state_store.done_urls(links_list)
+            if done_urls:
+                logging.info(f"Skipping {len(done_urls)} URLs processed in earlier runs (use --force to process them again).")
+                links_list = [curr_link for curr_link in links_list if curr_link not in done_urls]
+        if not links_list:
+            logging.info("No new links to process.")
+            state_store.close()
+            return
+
     # GPT API, model and version set up 
     GPT_API_KEY = gpt_api_key
-    ENDPOINT = "Please enter your endpoint here"
-    GPT_MODEL = "Please enter desired GPT model"
-    GPT_API_VERSION = "Please enter desired API version"
-
-    client = AzureOpenAI(
-        azure_endpoint = ENDPOINT, 
-        api_key = GPT_API_KEY, 
-        api_version = GPT_API_VERSION,
-        http_client = httpx.Client(verify = False)
+    llm_config = dict(config.get('llm') or {})
+    GPT_MODEL = llm_config.pop('model', None)
+    GPT_API_VERSION = llm_config.get('api_version')
+    deployments = llm_config.pop('deployments', None) or []
+    deployment_failure_threshold = llm_config.pop('failure_threshold', 3)
+    deployment_reset_timeout = llm_config.pop('reset_timeout', 60)
+    if not GPT_MODEL or not GPT_API_VERSION or not deployments:
+        logging.error("GPT model, API version or deployments not specified in the configuration.")
+        return
+
+    # Deployments with their own API key file (e.g. in another region)
+    for deployment in deployments:
+        if deployment.get('api_key_file'):
+            deployment['api_key'] = load_gpt_api(os.path.join(os.path.dirname(__file__), deployment.pop('api_key_file')))
+
+    # Retries of failed GPT requests (with jittered backoff and Retry-After) are made by generate_osint_item,
+    # and a deployment failing repeatedly stops being called for a while
+    llm_retry_config = config.get('llm_retry') or {}
+    llm_retry_policy = RetryPolicy(
+        retries=llm_retry_config.get('retries', 4),
+        base_delay=llm_retry_config.get('backoff_factor', 1.0),
+        max_delay=llm_retry_config.get('max_backoff', 60),
+        max_retry_after=llm_retry_config.get('max_retry_after', 120)
     )
+    llm_breaker = CircuitBreaker(llm_retry_config.get('failure_threshold', 5), llm_retry_config.get('reset_timeout', 60),
+                                 name='llm')
+
+    if args.batch:
+        # Batch mode: all prompts are sent at once as batch jobs to the batch deployment
+        batch_config = config.get('llm_batch') or {}
+        client = AzureOpenAI(
+            azure_endpoint = batch_config.get('endpoint') or deployments[0]['endpoint'],
+            api_key = GPT_API_KEY,
+            api_version = batch_config.get('api_version') or GPT_API_VERSION,
+            http_client = httpx.Client(verify = llm_config.get('verify_ssl', False))
+        )
+        batch_runner = BatchRunner(
+            client,
+            batch_config.get('deployment') or deployments[0]['deployment'],
+            os.path.join(os.path.dirname(__file__), batch_config.get('work_dir', 'cache/batches')),
+            poll_interval=batch_config.get('poll_interval', 60),
+            max_requests=batch_config.get('max_requests', 50000),
+            completion_window=batch_config.get('completion_window', '24h')
+        )
+    else:
+        # Many GPT requests in flight at once, paced against each deployment's tokens- and requests-per-minute quota
+        # and routed to the deployment with the most free capacity and the lowest latency
+        client = LLMRouter(deployments, GPT_API_KEY, defaults=llm_config,
+                           failure_threshold=deployment_failure_threshold, reset_timeout=deployment_reset_timeout)
+
+    # Persistent cache of GPT responses, so unchanged articles are not sent to GPT again
+    llm_cache = None
+    llm_cache_config = config.get('llm_cache') or {}
+    if llm_cache_config.get('enabled', False):
+        llm_cache_path = os.path.join(os.path.dirname(__file__), llm_cache_config.get('path', 'cache/llm_responses.sqlite3'))
+        llm_cache = LLMResponseCache(llm_cache_path, max_entries=llm_cache_config.get('max_entries', 10000))
+
+    # Output sink of the Osint items (the downloads folder by default)
+    output_config = dict(config.get('output') or {})
+    output_config['directory'] = os.path.expanduser(output_config.get('directory', os.path.join(home_directory, 'Downloads')))
+    output_sink = create_sink(**output_config)
+
+    # Extraction worker processes (BeautifulSoup work runs outside the main process)
+    extract_workers = pipeline_config.get('extract_workers', 2)
+    extraction_pool = None
+    extract_processes = pipeline_config.get('extract_processes', 0)
+    if extract_processes:
+        extraction_pool = ExtractionPool(processes=extract_processes, extraction_settings=extraction_config)
+        # Keep one waiting thread per worker process so the pool never idles
+        extract_workers = max(extract_workers, extraction_pool.processes)
 
     # Extracting article text from link (using relevant parser)
     # Taking each text to GPT with prompt and inserting result to json file
-    for curr_link in links_list:
-        logging.info(f"Processing URL: {curr_link}")
-        parser = find_parser_for_url(curr_link)
-        if parser:
-            data = parser.fetch_data(curr_link)
-            if data:
-                # Prepare the prompt by inserting the article data
-                prompt_w_article_text = prompt_template.format(data=data)
-
-                # Initialize extracted_data
-                extracted_data = None
-
-                # Call the GPT API
-                try:
-                    GPT_RES = client.chat.completions.create(
-                        model = GPT_MODEL, 
-                        messages=[
-                            {"role": "user", "content": prompt_w_article_text}
-                        ]
-                    )
-
-                    # Extract and parse the content
-                    final_content = GPT_RES.choices[0].message.content
-
-                    # Setting 'createdDate' field
-                    now = datetime.datetime.now()
-                    item_formatted_datetime = now.strftime("%Y-%m-%dT%H:%M:%S")
-
-                    # Osint item structure - Parsing format for json file
-                    extracted_data = {
-                            "title": "",
-                            "summary": """""",
-                            "createdDate": item_formatted_datetime,
-                            "source": curr_link
-                            # Add more fields as you wish
-                    }
-
-                    for line in final_content.strip().split('\n'):
-                        if ': ' in line:  # Ensure there's a key-value format in the line
-                            key, value = line.split(': ', 1)
-                            key = key.strip()
-                            value = value.strip()
-                            value = value.strip('"')  # Remove extra quotes from value
-                            if key in extracted_data:  # Make sure it's a valid key
-                                if value:  # Check if the value is not empty
-                                    if isinstance(extracted_data[key], list):
-                                        # Handle list values
-                                        extracted_data[key] = value.split(', ')
-                                    else:
-                                        # Handle non-list values
-                                        extracted_data[key] = value
-
-                    # Empty fields handling
-                    must_fields = ["title", "summary", "createdDate", "source"]
-
-                    for field in must_fields:
-                        # Retrieve the field value (could be None if the field does not exist)
-                        field_value = extracted_data.get(field, "")
-                        # Check if the field value is empty
-                        if not field_value:
-                            print(f"Field '{field}' is empty. Can't proceed with item creation. article link: {curr_link}")
-                            break
-
-                except Exception as e:
-                    logging.error(f"Error calling GPT API for {curr_link}: {e}")
-
-                # Output folder definition (downloads folder)
-                downloads_directory = os.path.join(home_directory, 'Downloads')
-                current_time = datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
-                file_name = f"data_output_{current_time}.json"
-                file_path = os.path.join(downloads_directory, file_name)
-
-                # Write the data to a JSON file
-                with open(file_path, "w") as json_file:
-                    json.dump(extracted_data, json_file, indent=4)
-
-            else:
-                logging.warning(f"No data returned from {curr_link}")
+    stages = [
+        Stage('fetch', lambda job: fetch_article(job, state_store, access_check, scheduler),
+              workers=pipeline_config.get('fetch_workers', 8)),
+        Stage('extract',
+              lambda job: extract_article(job, extraction_pool, state_store, args.force),
+              workers=extract_workers)
+    ]
+    extracted_jobs = []
+
+    def collect_job(job):
+        extracted_jobs.append(job)
+        return job
+
+    if args.batch:
+        # The extracted articles are kept for the batch jobs sent after the downloads
+        stages.append(Stage('collect', collect_job))
+    else:
+        stages += [
+            Stage('llm',
+                  lambda job: generate_osint_item(job, client, GPT_MODEL, prompt_template, llm_cache, GPT_API_VERSION,
+                                                  state_store, llm_retry_policy, llm_breaker),
+                  workers=max(pipeline_config.get('llm_workers', 4), client.max_concurrency)),
+            Stage('write', lambda job: write_osint_item(job, output_sink, state_store))
+        ]
+
+    # URLs interleaved by site, so the fetch workers are not all waiting on the budget of one site
+    fetch_order = scheduler.interleave(links_list) if scheduler else links_list
+    jobs = ({'url': curr_link} for curr_link in fetch_order)
+    try:
+        if pipeline_config.get('enabled', False):
+            stats = Pipeline(stages, queue_size=pipeline_config.get('queue_size', 32)).run(jobs)
         else:
-            logging.warning(f"No parser found for URL: {curr_link}")
+            stats = run_sequentially(stages, jobs)
+        if args.batch:
+            written, failed = generate_osint_items_in_batch(extracted_jobs, batch_runner, GPT_MODEL, prompt_template,
+                                                            output_sink, llm_cache, GPT_API_VERSION, state_store)
+            stats['batch'] = {'processed': written, 'dropped': 0, 'failed': failed}
+    finally:
+        client.close()
+        output_sink.close()
+        if extraction_pool:
+            extraction_pool.close()
+        if llm_cache:
+            llm_cache.close()
+        if state_store:
+            logging.info(f"URL states: {state_store.status_counts()}")
+            state_store.close()
+    logging.info(f"Finished processing {len(links_list)} URLs: {stats}")
+
+    # Export the stage timings and counters of the run
+    for stage_name, stage_stats in stats.items():
+        for outcome, count in stage_stats.items():
+            metrics.increment('pipeline_items_total', count, stage=stage_name, outcome=outcome)
+    metrics_config = config.get('metrics') or {}
+    metrics_files = {key: os.path.join(os.path.dirname(__file__), metrics_config[key])
+                     for key in ('prometheus_file', 'json_file') if metrics_config.get(key)}
+    if metrics_files:
+        metrics.export(**metrics_files)
+        logging.info(f"Metrics written to {', '.join(metrics_files.values())}")
 
 if __name__ == '__main__':
     main()
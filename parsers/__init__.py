@@ -1,15 +1,104 @@
-# This file handles the dynamic importing of parser modules and maintains the parser_registry
+# This file maintains the parser_registry and loads the parser modules.
+# Parser modules are imported lazily: manifest.json maps the domains of every parser to its module, and a
+# module is imported when the first URL of one of its domains is looked up. Without an up to date manifest
+# all parser modules are imported at startup. Regenerate the manifest with: python -m parsers.manifest
 
-import pkgutil      # find and load modules
 import importlib    # import modules dynamically
+import json
+import logging
+import os
+import threading
+from .dispatch import DomainIndex, url_host
 
 parser_registry = []
 
+# Index of the domains declared by the registered parsers (see dispatch.py)
+parser_index = DomainIndex()
+
+# Path of the generated manifest of the parser modules and their domains
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), 'manifest.json')
+
+# Index of the manifest domains, mapping to parser module names
+_module_index = DomainIndex()
+
+# Parser modules without declared domains, imported when no domain matches a URL
+_fallback_modules = []
+
+# Parser modules imported so far
+_loaded_modules = set()
+_load_lock = threading.Lock()
+
 # Registers a parser instance in the parser_registry
 def register_parser(parser_instance):
     parser_registry.append(parser_instance)
+    for domain in parser_instance.domains:
+        parser_index.add(domain, parser_instance)
+
+# Returns the sorted names of the parser modules in the package
+# (a plain directory listing, pkgutil would import inspect at startup)
+def parser_modules():
+    package_dir = os.path.dirname(__file__)
+    return sorted(file_name[:-3] for file_name in os.listdir(package_dir) if file_name.endswith('_parser.py'))
+
+# Reads the manifest, or returns None if it is missing or does not list the current parser modules
+def read_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+    modules = manifest.get('modules') or {}
+    if sorted(modules) != parser_modules():
+        return None
+    return manifest
+
+# Imports a parser module once, which registers its parsers
+def _load_module(module_name):
+    if module_name in _loaded_modules:
+        return
+    with _load_lock:
+        if module_name not in _loaded_modules:
+            importlib.import_module(f'{__name__}.{module_name}')
+            _loaded_modules.add(module_name)
+
+# Imports every parser module (e.g. in extraction worker processes) and returns the parser_registry
+def load_all_parsers():
+    for module_name in parser_modules():
+        _load_module(module_name)
+    return parser_registry
+
+# Finds the parser for the given URL: the parser declaring the longest matching domain,
+# or else the first parser without declared domains whose can_handle accepts the URL
+def find_parser(url):
+    host = url_host(url)
+    if not host:
+        return None
+
+    module_name = _module_index.find_host(host)
+    if module_name is not None:
+        _load_module(module_name)
+
+    parser = parser_index.find_host(host)
+    if parser is not None:
+        return parser
+    if module_name is not None:
+        logging.warning(f"Parser module {module_name} does not handle {host}. Regenerate the parser manifest.")
+
+    for fallback_module in _fallback_modules:
+        _load_module(fallback_module)
+    for parser in parser_registry:
+        if not parser.domains and parser.can_handle(url):
+            return parser
+    return None
 
-# Dynamically import all parser modules in the current package
-for loader, module_name, is_pkg in pkgutil.walk_packages(__path__):
-    if module_name.endswith('_parser'):
-        importlib.import_module(f'{__name__}.{module_name}')
+_manifest = read_manifest()
+if _manifest is None:
+    logging.debug("Parser manifest is missing or outdated, importing all parser modules.")
+    load_all_parsers()
+else:
+    for _module_name, _domains in _manifest['modules'].items():
+        for _domain in _domains:
+            _module_index.add(_domain, _module_name)
+        if not _domains:
+            _fallback_modules.append(_module_name)
@@ -0,0 +1,93 @@
+# This file maps URLs to parsers through an index of the domains each parser declares.
+# The domains are stored in a trie of reversed host labels (e.g. com -> microsoft -> www), so finding the
+# parser of a URL takes one URL parse and one step per host label, however many parsers are registered.
+# The longest matching domain wins, so 'unit42.paloaltonetworks.com' is preferred over 'paloaltonetworks.com'.
+
+from urllib.parse import urlparse
+
+# Key of the parser stored at a trie node (host labels never contain a space)
+_PARSER = ' parser'
+
+
+def url_host(url):
+    """
+    Returns:
+        str: The lowercase host name of a URL, without port or credentials, or '' if it has none.
+    """
+    try:
+        return urlparse(url).hostname or ''
+    except ValueError:
+        return ''
+
+
+def _name(value):
+    return value if isinstance(value, str) else type(value).__name__
+
+
+def _labels(domain):
+    return reversed(domain.lower().strip('.').split('.'))
+
+
+def host_matches(host, domain):
+    """
+    Checks if a host is the given domain or one of its subdomains.
+
+    Parameters:
+        host (str): Lowercase host name, e.g. 'www.microsoft.com'.
+        domain (str): Domain name, e.g. 'microsoft.com'.
+
+    Returns:
+        bool: True if the host is inside the domain. Matches whole labels only, so 'notmicrosoft.com'
+            is not inside 'microsoft.com'.
+    """
+    domain = domain.lower()
+    return host == domain or host.endswith('.' + domain)
+
+
+class DomainIndex:
+    """
+    Suffix trie of reversed domain labels that finds the parser of a host.
+    The stored values can also be parser module names, as in the lazy loading index of the package.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, domain, parser):
+        """
+        Adds a domain and its subdomains to the index.
+
+        Parameters:
+            domain (str): Domain name handled by the parser, e.g. 'cisa.gov'.
+            parser (ParserBase): The parser of the domain.
+        """
+        node = self.root
+        for label in _labels(domain):
+            node = node.setdefault(label, {})
+
+        current = node.get(_PARSER)
+        if current is not None and current is not parser:
+            raise ValueError(f"Domain '{domain}' is declared by both {_name(current)} and {_name(parser)}.")
+        node[_PARSER] = parser
+
+    def find_host(self, host):
+        """
+        Returns:
+            ParserBase: The parser of the longest domain that contains the host, or None.
+        """
+        node = self.root
+        parser = None
+        for label in _labels(host):
+            node = node.get(label)
+            if node is None:
+                break
+            parser = node.get(_PARSER, parser)
+        return parser
+
+    def find(self, url):
+        """
+        Returns:
+            ParserBase: The parser of the longest domain that contains the URL host, or None.
+        """
+        host = url_host(url)
+        return self.find_host(host) if host else None
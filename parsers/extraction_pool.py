@@ -0,0 +1,93 @@
+# This file runs article text extraction in a pool of worker processes.
+# Building and walking the BeautifulSoup tree is pure Python CPU work that holds the GIL, so running it in
+# separate processes lets extraction scale across all cores while the main process keeps doing network I/O.
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+
+# Parser instances of the worker process, keyed by class name
+_worker_parsers = {}
+
+
+def _init_worker(extraction_settings):
+    """
+    Imports every parser module once when a worker process starts, so each task only pays for the extraction.
+    """
+    from parsers import load_all_parsers
+    from parsers.parser_base import ParserBase
+
+    ParserBase.configure_extraction(**extraction_settings)
+
+    for parser in load_all_parsers():
+        _worker_parsers[type(parser).__name__] = parser
+
+
+def _ping():
+    return os.getpid()
+
+
+def _extract_in_worker(parser_name, html, url):
+    """
+    Runs the extraction of the named parser inside a worker process.
+
+    Parameters:
+        parser_name (str): Class name of the parser to use.
+        html (bytes): Raw HTML of the page.
+        url (str): The page URL.
+
+    Returns:
+        tuple: The extracted article text, and the tree build and traversal times of the extraction.
+    """
+    parser = _worker_parsers.get(parser_name)
+    if parser is None:
+        raise LookupError(f"Parser {parser_name} is not available in the extraction worker.")
+    timings = {}
+    return parser.extract(html, url, timings), timings
+
+
+class ExtractionPool:
+    """
+    Pool of warm worker processes that turn raw HTML into article text.
+
+    Parameters:
+        processes (int): Number of worker processes. Defaults to the number of CPUs.
+        extraction_settings (dict): Settings passed to ParserBase.configure_extraction in every worker.
+    """
+
+    def __init__(self, processes=None, extraction_settings=None):
+        self.processes = processes or os.cpu_count() or 1
+        # The workers are spawned, not forked: the main process already runs threads (the GPT client's event
+        # loop, fetch workers) whose locks and sockets a forked child would inherit in an undefined state
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(extraction_settings or {},)
+        )
+
+        # Start every worker up front so the parser imports are not paid by the first articles
+        wait([self.executor.submit(_ping) for _ in range(self.processes)])
+        logging.info(f"Started {self.processes} extraction worker processes.")
+
+    def extract(self, parser, html, url):
+        """
+        Extracts the article text of a page in a worker process and waits for the result.
+
+        Parameters:
+            parser (ParserBase): The parser that handles the page URL.
+            html (bytes): Raw HTML of the page.
+            url (str): The page URL.
+
+        Returns:
+            str: The extracted article text. Exceptions raised by the parser are re-raised here.
+        """
+        future = self.executor.submit(_extract_in_worker, type(parser).__name__, html, url)
+        data, timings = future.result()
+        # Metrics of the worker processes are recorded in the main process
+        parser.record_extraction_metrics(url, timings)
+        return data
+
+    def close(self):
+        self.executor.shutdown(wait=True)
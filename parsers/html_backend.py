@@ -0,0 +1,89 @@
+# This file selects the HTML tree builder used by the parsers.
+# BeautifulSoup's pure-Python 'html.parser' is always available and stays the fallback. C-backed builders
+# such as lxml are used when they are installed, and a comparison mode checks that they produce the same
+# article text before switching to them.
+
+import logging
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+# Pure-Python tree builder that ships with Python
+FALLBACK_BACKEND = 'html.parser'
+
+# Tree builders tried by 'auto', fastest first
+PREFERRED_BACKENDS = ('lxml', FALLBACK_BACKEND)
+
+
+def is_available(backend):
+    """
+    Checks if a BeautifulSoup tree builder is installed.
+
+    Parameters:
+        backend (str): Tree builder name, e.g. 'lxml' or 'html.parser'.
+
+    Returns:
+        bool: True if the tree builder can be used.
+    """
+    return builder_registry.lookup(backend) is not None
+
+
+def available_backends():
+    """
+    Returns:
+        list: The installed tree builders out of PREFERRED_BACKENDS, fastest first.
+    """
+    return [backend for backend in PREFERRED_BACKENDS if is_available(backend)]
+
+
+def resolve_backend(backend):
+    """
+    Resolves a configured backend name to an installed tree builder.
+
+    Parameters:
+        backend (str): A tree builder name, or 'auto' for the fastest installed one.
+
+    Returns:
+        str: The tree builder to use. Falls back to 'html.parser' if the requested one is not installed.
+    """
+    if not backend or backend == 'auto':
+        return available_backends()[0]
+
+    if not is_available(backend):
+        logging.warning(f"HTML backend '{backend}' is not installed. Falling back to '{FALLBACK_BACKEND}'.")
+        return FALLBACK_BACKEND
+
+    return backend
+
+
+def make_soup(html, backend=FALLBACK_BACKEND, parse_only=None):
+    """
+    Parses raw HTML with the given tree builder.
+
+    Parameters:
+        html (bytes): Raw HTML of the page.
+        backend (str): An installed tree builder name.
+        parse_only (SoupStrainer): Only build the matching subtrees.
+
+    Returns:
+        BeautifulSoup: The parsed page.
+    """
+    return BeautifulSoup(html, backend, parse_only=parse_only)
+
+
+def compare_backends(parser, html, url, backends=None):
+    """
+    Runs the extraction of a parser with every installed tree builder.
+
+    Parameters:
+        parser (ParserBase): The parser that handles the page URL.
+        html (bytes): Raw HTML of the page.
+        url (str): The page URL.
+        backends (iterable): Tree builders to compare. Defaults to all installed ones.
+
+    Returns:
+        dict: The extracted article text of each tree builder.
+    """
+    return {
+        backend: parser.extract_with_backend(html, url, backend)
+        for backend in (backends or available_backends())
+    }
@@ -0,0 +1,43 @@
+# This file generates manifest.json, the list of parser modules and the domains they handle.
+# The package reads the manifest to import a parser module only when a URL of its domains arrives.
+# Run it after adding a parser or changing the domains of a parser:
+#     python -m parsers.manifest
+
+import json
+from parsers import MANIFEST_PATH, load_all_parsers, parser_modules
+
+
+def build_manifest():
+    """
+    Imports every parser module and collects the domains declared by its parsers.
+
+    Returns:
+        dict: {'modules': {module name: [domains]}}. Modules whose parsers declare no domains have an empty list.
+    """
+    modules = {module_name: [] for module_name in parser_modules()}
+    for parser in load_all_parsers():
+        module_name = type(parser).__module__.rsplit('.', 1)[-1]
+        modules[module_name].extend(parser.domains)
+    return {'modules': modules}
+
+
+def write_manifest(path=MANIFEST_PATH):
+    """
+    Writes the manifest of the parser modules.
+
+    Parameters:
+        path (str): Path of the manifest file.
+
+    Returns:
+        dict: The written manifest.
+    """
+    manifest = build_manifest()
+    with open(path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=4, sort_keys=True)
+        manifest_file.write('\n')
+    return manifest
+
+
+if __name__ == '__main__':
+    manifest = write_manifest()
+    print(f"Wrote {len(manifest['modules'])} parser modules to {MANIFEST_PATH}")
@@ -1,31 +1,160 @@
 # This file defines the base class ParserBase that all individual parsers inherit from
 
 import logging
-from abc import ABC, abstractmethod
-from urllib.parse import urlparse
-
-# Configures the logging system to output messages with a timestamp, severity level, and message
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log"),
-        logging.StreamHandler()
-    ]
-)
+import time
+from abc import ABC
+from utils.http_client import FetchService
+from utils.metrics import metrics
+from .html_backend import FALLBACK_BACKEND, make_soup, resolve_backend
+from .dispatch import url_host, host_matches
+
+# Adds the tree build and traversal durations of one extraction to a timings dict
+def _add_timings(timings, started, built, finished):
+    if timings is not None:
+        timings['tree_build'] = timings.get('tree_build', 0.0) + built - started
+        timings['traversal'] = timings.get('traversal', 0.0) + finished - built
 
 # The base class for all parsers. It defines the interface and common methods.
-class ParserBase(ABC): 
-
-    # Abstract method to fetch data from a given URL
-    @abstractmethod
-    def fetch_data(self):
-        raise NotImplementedError("Subclasses must implement the fetch_data method.")
-    
-    # Determines if the parser can handle the given URL
-    @abstractmethod
+class ParserBase(ABC):
+
+    # Shared fetch service (pooled connections, headers, timeouts and retries) used by all parsers
+    fetcher = FetchService()
+
+    # Domains handled by the parser, including their subdomains (e.g. ('microsoft.com',))
+    domains = ()
+
+    # Site specific request headers, merged over the fetch service default headers
+    request_headers = {}
+
+    # Compiled extraction rules of the site (see rules.py)
+    rules = None
+
+    # Parse only the article subtrees listed in the rules' parse_only instead of the full page
+    partial_parse = True
+
+    # Tree builder used to parse the pages (see html_backend.py)
+    html_backend = FALLBACK_BACKEND
+
+    # Also extract every page with the fallback tree builder and log any difference in the article text
+    compare_backends = False
+
+    # Replaces the shared fetch service, e.g. with settings from the configuration file
+    @classmethod
+    def configure_fetcher(cls, **settings):
+        ParserBase.fetcher.close()
+        ParserBase.fetcher = FetchService(**settings)
+
+    # Labels of the metrics recorded for the given URL
+    def metric_labels(self, url):
+        return {'parser': type(self).__name__, 'domain': url_host(url)}
+
+    # Makes a GET request for the given URL through the shared fetch service.
+    # Records the total time, the time to the response headers (connection set-up included) and the body download time.
+    def get(self, url):
+        labels = self.metric_labels(url)
+        started = time.perf_counter()
+        try:
+            response = self.fetcher.get(url, headers=self.request_headers)
+        except Exception:
+            metrics.increment('fetch_errors_total', **labels)
+            raise
+        total = time.perf_counter() - started
+
+        headers_time = response.elapsed.total_seconds()
+        metrics.observe('fetch_seconds', total, **labels)
+        metrics.observe('fetch_ttfb_seconds', headers_time, **labels)
+        metrics.observe('fetch_body_seconds', max(0.0, total - headers_time), **labels)
+        metrics.increment('fetch_bytes_total', len(response.content), **labels)
+        if getattr(response, 'from_cache', False):
+            metrics.increment('fetch_cache_hits_total', **labels)
+        return response
+
+    # Downloads the raw HTML of the given URL
+    def fetch(self, url):
+        return self.get(url).content
+
+    # Sets how pages are parsed, e.g. with settings from the configuration file
+    @classmethod
+    def configure_extraction(cls, partial_parse=True, html_backend=FALLBACK_BACKEND, compare_backends=False):
+        ParserBase.partial_parse = partial_parse
+        ParserBase.html_backend = resolve_backend(html_backend)
+        ParserBase.compare_backends = compare_backends and ParserBase.html_backend != FALLBACK_BACKEND
+
+    # Extracts the article text from raw HTML, without any network access, using the site's extraction rules.
+    # Returns an empty string if the expected elements are not found in the HTML.
+    # The tree build and traversal times are recorded in the metrics, or added to the given timings dict instead
+    # (e.g. in an extraction worker process, whose caller records them with record_extraction_metrics).
+    # Parsers without extraction rules must override this method.
+    def extract(self, html, url, timings=None):
+        record = timings is None
+        if record:
+            timings = {}
+        data = self.extract_with_backend(html, url, self.html_backend, timings)
+        if record:
+            self.record_extraction_metrics(url, timings)
+
+        # Comparison mode: check that the configured tree builder gives the same text as the fallback one
+        if self.compare_backends:
+            expected = self.extract_with_backend(html, url, FALLBACK_BACKEND)
+            if data != expected:
+                logging.warning(
+                    f"HTML backend '{self.html_backend}' extracted different text than '{FALLBACK_BACKEND}' for {url} "
+                    f"({len(data)} vs {len(expected)} characters)."
+                )
+
+        return data
+
+    # Records the tree build and traversal times of one extraction
+    def record_extraction_metrics(self, url, timings):
+        labels = self.metric_labels(url)
+        for stage in ('tree_build', 'traversal'):
+            if stage in timings:
+                metrics.observe(f'{stage}_seconds', timings[stage], **labels)
+
+    # Extracts the article text from raw HTML with the given tree builder.
+    # When a timings dict is given, the seconds spent building the tree and walking it are added
+    # to its 'tree_build' and 'traversal' entries.
+    def extract_with_backend(self, html, url, backend, timings=None):
+        if self.rules is None:
+            raise NotImplementedError("Subclasses must define extraction rules or implement the extract method.")
+
+        # Build only the article subtrees first, and fall back to the full page if an element is missing
+        if self.partial_parse and self.rules.parse_only is not None:
+            started = time.perf_counter()
+            soup = make_soup(html, backend, parse_only=self.rules.parse_only)
+            built = time.perf_counter()
+            data = self.rules.extract(soup, warn=False)
+            _add_timings(timings, started, built, time.perf_counter())
+            if data is not None:
+                return data
+            logging.debug(f"Partial parse of {url} missed an element, parsing the full page.")
+
+        started = time.perf_counter()
+        soup = make_soup(html, backend)  # Parse the HTML content
+        built = time.perf_counter()
+        data = self.rules.extract(soup)
+        _add_timings(timings, started, built, time.perf_counter())
+        return data if data is not None else ''
+
+    # Fetches the given URL and extracts its article text.
+    # A page already downloaded for the URL (e.g. by the access check) is given as html and not fetched again.
+    def fetch_data(self, url, html=None):
+        try:
+            if html is None:
+                html = self.fetch(url)
+            return self.extract(html, url)
+        except Exception as e:
+            self.handle_error(e)  # Handle any exceptions using the base class method
+            return ''  # Return an empty string if an error occurs
+
+    # Determines if the parser can handle the given URL.
+    # Parsers that declare their domains are dispatched through the domain index (see dispatch.py),
+    # other parsers must override this method.
     def can_handle(self, url):
-        pass
+        if not self.domains:
+            raise NotImplementedError("Subclasses must declare their domains or implement the can_handle method.")
+        host = url_host(url)
+        return any(host_matches(host, domain) for domain in self.domains)
 
     # Handles errors that occur during data fetching
     def handle_error(self, error):
@@ -0,0 +1,203 @@
+# This file compiles the declarative extraction rules of the parsers.
+# Each parser describes its site with a small dictionary of CSS selectors and text filters. The dictionary is
+# compiled once when the parser module is imported, into precompiled soupsieve selectors and a BlockWalker,
+# so extracting an article does not rebuild selectors or filter lists on every call.
+
+import logging
+import re
+import soupsieve as sv
+from bs4 import SoupStrainer
+from .traversal import BlockWalker
+
+# Supported rule keys and their defaults
+#   root              - selector of the element that contains the title, subtitle and content (default: whole page)
+#   title, subtitle   - selectors of the article title and subtitle (optional)
+#   content           - selector of the article content (required)
+#   parse_only        - attribute values of the elements that contain the title, subtitle and content,
+#                       e.g. {'class': ['entry-title', 'entry-content']}. When set, only those subtrees are parsed.
+#   headers           - tag names processed as headers
+#   wanted_headers    - selector of the headers that start a wanted section; the other headers start skipping
+#                       content until the next wanted header (default: every header)
+#   stop_headers      - substrings of headers that start an unwanted section
+#   exact_headers     - match stop_headers against the whole header text
+#   stop_mode         - 'section' (skip until the next wanted header), 'end' (skip the rest) or 'omit' (drop the header only)
+#   lists             - tag names processed as lists
+#   direct_list_items - only emit the li elements that are direct children of a list
+#   stop_list_items   - substrings of list items that start skipping content
+#   tables            - emit the th/td cells of table rows
+#   stop_paragraphs   - substrings of paragraphs that start skipping content
+#   omit_paragraphs   - substrings of paragraphs that are left out
+#   exact_paragraphs  - match omit_paragraphs against the whole paragraph text
+#   skip_paragraphs   - selector of paragraphs that are left out
+#   exclude_tags      - tag names whose text is left out of paragraphs
+#   skip              - selector of elements whose subtree is not walked
+#   skip_ends_article - stop the walk at the first element matched by skip
+#   blocks            - list of {'selector': ..., 'stop': [...]} elements emitted as a whole block
+#   header_separator, header_suffix, item_suffix - text formatting of headers and items
+#   recursive         - walk the whole content subtree, or only its direct children
+#   start_skipped     - skip the content before the first wanted header
+_DEFAULTS = {
+    'root': None,
+    'title': None,
+    'subtitle': None,
+    'content': None,
+    'parse_only': None,
+    'headers': ('h2', 'h3', 'h4', 'h5', 'h6'),
+    'wanted_headers': None,
+    'stop_headers': (),
+    'exact_headers': False,
+    'stop_mode': 'section',
+    'lists': ('ul', 'ol'),
+    'direct_list_items': False,
+    'stop_list_items': (),
+    'tables': False,
+    'stop_paragraphs': (),
+    'omit_paragraphs': (),
+    'exact_paragraphs': False,
+    'skip_paragraphs': None,
+    'exclude_tags': (),
+    'skip': None,
+    'skip_ends_article': False,
+    'blocks': (),
+    'header_separator': '',
+    'header_suffix': '\n\n',
+    'item_suffix': '\n\n',
+    'recursive': True,
+    'start_skipped': False
+}
+
+
+def _compile_selector(selector):
+    return sv.compile(selector) if selector else None
+
+
+def _match_function(selector):
+    compiled = _compile_selector(selector)
+    return compiled.match if compiled else None
+
+
+def _compile_strainer(parse_only):
+    """
+    Builds the SoupStrainer that keeps only the elements having one of the given attribute values.
+    The values are matched with regular expressions, because the tree builder passes multi-valued
+    attributes such as class to the strainer as one unsplit string.
+    """
+    if not parse_only:
+        return None
+
+    attrs = {}
+    for attribute, values in parse_only.items():
+        if isinstance(values, str):
+            values = [values]
+        alternatives = '|'.join(re.escape(value) for value in values)
+        if attribute == 'class':
+            attrs[attribute] = re.compile(rf'(?:^|\s)(?:{alternatives})(?:\s|$)')
+        else:
+            attrs[attribute] = re.compile(rf'^(?:{alternatives})$')
+    return SoupStrainer(attrs=attrs)
+
+
+class ExtractionRules:
+    """
+    Compiled extraction rules of one site.
+
+    Parameters:
+        spec (dict): The declarative rules (see the supported keys above).
+    """
+
+    def __init__(self, spec):
+        unknown = set(spec) - set(_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown extraction rule keys: {', '.join(sorted(unknown))}")
+        if not spec.get('content'):
+            raise ValueError("Extraction rules need a 'content' selector.")
+
+        rules = dict(_DEFAULTS, **spec)
+        self.spec = rules
+        self.root = _compile_selector(rules['root'])
+        self.title = _compile_selector(rules['title'])
+        self.subtitle = _compile_selector(rules['subtitle'])
+        self.content = _compile_selector(rules['content'])
+        self.parse_only = _compile_strainer(rules['parse_only'])
+
+        self.walker = BlockWalker(
+            header_tags=rules['headers'],
+            list_tags=rules['lists'],
+            row_tags=('tr',) if rules['tables'] else (),
+            wanted_header=_match_function(rules['wanted_headers']),
+            stop_headers=rules['stop_headers'],
+            exact_headers=rules['exact_headers'],
+            stop_mode=rules['stop_mode'],
+            stop_paragraphs=rules['stop_paragraphs'],
+            stop_list_items=rules['stop_list_items'],
+            omit_paragraphs=rules['omit_paragraphs'],
+            exact_paragraphs=rules['exact_paragraphs'],
+            skip_paragraph=_match_function(rules['skip_paragraphs']),
+            paragraph_exclude_tags=rules['exclude_tags'],
+            skip_element=_match_function(rules['skip']),
+            skip_ends_article=rules['skip_ends_article'],
+            extra_blocks=[(_match_function(block['selector']), block.get('stop', ())) for block in rules['blocks']],
+            header_separator=rules['header_separator'],
+            header_suffix=rules['header_suffix'],
+            item_suffix=rules['item_suffix'],
+            recursive=rules['recursive'],
+            direct_list_items=rules['direct_list_items'],
+            start_skipped=rules['start_skipped']
+        )
+
+    def _select(self, scope, field, warn):
+        element = getattr(self, field).select_one(scope)
+        if element is None and warn:
+            logging.warning(f"Target '{self.spec[field]}' related to {field} not found in the HTML.")
+        return element
+
+    def extract(self, soup, warn=True):
+        """
+        Extracts the article text from a parsed page.
+
+        Parameters:
+            soup (BeautifulSoup): The parsed page.
+            warn (bool): Log a warning when an element is missing.
+
+        Returns:
+            str: The title, subtitle and content of the article, or None if an element is missing.
+        """
+        scope = soup
+        if self.root is not None:
+            scope = self._select(soup, 'root', warn)
+            if scope is None:
+                return None
+
+        headlines = []
+        for field in ('title', 'subtitle'):
+            if getattr(self, field) is not None:
+                element = self._select(scope, field, warn)
+                if element is None:
+                    return None
+                headlines.append(element.get_text(strip=True))
+
+        article_content = self._select(scope, 'content', warn)
+        if article_content is None:
+            return None
+
+        # Extract full article content
+        content = self.walker.extract_text(article_content)
+
+        # Combine title + content
+        data = '\n'.join(headlines) + '\n\n' + content if headlines else content
+
+        # Remove any leading/trailing whitespace and get the full article text
+        return data.strip()
+
+
+def compile_rules(spec):
+    """
+    Compiles the declarative extraction rules of a site.
+
+    Parameters:
+        spec (dict): The declarative rules.
+
+    Returns:
+        ExtractionRules: The compiled rules.
+    """
+    return ExtractionRules(spec)
@@ -0,0 +1,255 @@
+# This file defines the shared traversal engine that turns an article subtree into text blocks.
+# The subtree is walked once in document order. Headers, paragraphs, lists, table rows and extra blocks
+# are emitted as they are reached and their subtrees are not walked again, so the extraction time grows
+# linearly with the page size instead of re-walking nested lists and tables for every element.
+
+from bs4 import Tag, NavigableString, CData
+
+# String types included in the text of an element (the same as BeautifulSoup's get_text default)
+_TEXT_STRING_TYPES = (NavigableString, CData)
+
+
+def element_text(element, separator=' ', exclude=()):
+    """
+    Collects the stripped, non-empty strings of an element in a single pass.
+
+    Parameters:
+        element (Tag): The element to read.
+        separator (str): String placed between the collected strings.
+        exclude (iterable): Tag names whose text is left out (e.g. 'code').
+
+    Returns:
+        str: The text of the element.
+    """
+    if not exclude:
+        return element.get_text(separator=separator, strip=True)
+
+    parts = []
+    stack = [iter(element.children)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+        elif isinstance(child, Tag):
+            if child.name not in exclude:
+                stack.append(iter(child.children))
+        elif type(child) in _TEXT_STRING_TYPES:
+            text = child.strip()
+            if text:
+                parts.append(text)
+    return separator.join(parts)
+
+
+def _iter_items(element, item_tags, direct_only=False):
+    """
+    Yields the item elements (e.g. li, td) of a list or table row without descending into the items.
+    """
+    if direct_only:
+        for child in element.children:
+            if isinstance(child, Tag) and child.name in item_tags:
+                yield child
+        return
+
+    stack = [iter(element.children)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+        elif isinstance(child, Tag):
+            if child.name in item_tags:
+                yield child
+            else:
+                stack.append(iter(child.children))
+
+
+def _matches_any(text, substrings, exact=False):
+    if exact:
+        return text in substrings
+    return any(substring in text for substring in substrings)
+
+
+class _WalkState:
+    """
+    Mutable state of one walk, kept apart from the walker so a walker can be shared between threads.
+    """
+
+    def __init__(self, skip):
+        self.blocks = []
+        self.skip = skip
+        self.ended = False
+
+
+class BlockWalker:
+    """
+    Walks an article subtree once and builds the article text from its blocks.
+
+    Parameters:
+        header_tags (iterable): Tag names processed as headers.
+        list_tags (iterable): Tag names processed as lists (their li items are emitted).
+        row_tags (iterable): Tag names processed as table rows (their th/td cells are emitted).
+        wanted_header (callable): Called with each header; headers it returns False for start skipping content
+            until the next wanted header, like a stop header in 'section' mode. None accepts every header.
+        stop_headers (iterable): Substrings of headers that start an unwanted section.
+        exact_headers (bool): Match stop_headers against the whole header text instead of substrings.
+        stop_mode (str): What an unwanted header does:
+            'section' - skip the content until the next wanted header,
+            'end' - skip everything after it,
+            'omit' - only leave out the header itself.
+        stop_paragraphs (iterable): Substrings of paragraphs that start skipping content until the next wanted header.
+        stop_list_items (iterable): Substrings of list items that start skipping content until the next wanted header.
+        omit_paragraphs (iterable): Substrings of paragraphs that are left out.
+        exact_paragraphs (bool): Match omit_paragraphs against the whole paragraph text instead of substrings.
+        skip_paragraph (callable): Called with each paragraph; paragraphs it returns True for are left out.
+        paragraph_exclude_tags (iterable): Tag names whose text is left out of paragraphs (e.g. 'code').
+        skip_element (callable): Called with each element; elements it returns True for are not walked.
+        skip_ends_article (bool): Skip everything after the first element matched by skip_element.
+        extra_blocks (iterable): Pairs of (match, stop_substrings). Elements for which match returns True are
+            emitted as a whole block, or start skipping content if their text contains a stop substring.
+        header_separator (str): Separator used when reading the header text.
+        header_suffix (str): Appended after every header.
+        item_suffix (str): Appended after every list item and table cell.
+        recursive (bool): Walk the whole subtree, or only the direct children of the root.
+        direct_list_items (bool): Only emit the li elements that are direct children of a list.
+        start_skipped (bool): Skip the content before the first wanted header.
+    """
+
+    def __init__(self, header_tags=('h2', 'h3', 'h4', 'h5', 'h6'), list_tags=('ul', 'ol'), row_tags=(),
+                 wanted_header=None, stop_headers=(), exact_headers=False, stop_mode='section',
+                 stop_paragraphs=(), stop_list_items=(), omit_paragraphs=(), exact_paragraphs=False,
+                 skip_paragraph=None, paragraph_exclude_tags=(),
+                 skip_element=None, skip_ends_article=False, extra_blocks=(),
+                 header_separator='', header_suffix='\n\n', item_suffix='\n\n',
+                 recursive=True, direct_list_items=False, start_skipped=False):
+        if stop_mode not in ('section', 'end', 'omit'):
+            raise ValueError(f"Unknown stop_mode '{stop_mode}'.")
+
+        self.header_tags = frozenset(header_tags)
+        self.list_tags = frozenset(list_tags)
+        self.row_tags = frozenset(row_tags)
+        self.wanted_header = wanted_header
+        self.stop_headers = tuple(stop_headers)
+        self.exact_headers = exact_headers
+        self.stop_mode = stop_mode
+        self.stop_paragraphs = tuple(stop_paragraphs)
+        self.stop_list_items = tuple(stop_list_items)
+        self.omit_paragraphs = tuple(omit_paragraphs)
+        self.exact_paragraphs = exact_paragraphs
+        self.skip_paragraph = skip_paragraph
+        self.paragraph_exclude_tags = frozenset(paragraph_exclude_tags)
+        self.skip_element = skip_element
+        self.skip_ends_article = skip_ends_article
+        self.extra_blocks = tuple(extra_blocks)
+        self.header_separator = header_separator
+        self.header_suffix = header_suffix
+        self.item_suffix = item_suffix
+        self.recursive = recursive
+        self.direct_list_items = direct_list_items
+        self.start_skipped = start_skipped
+
+    def extract_text(self, root):
+        """
+        Walks the subtree of root and returns its article text.
+
+        Parameters:
+            root (Tag): The article content element.
+
+        Returns:
+            str: The text blocks of the article, each followed by its suffix.
+        """
+        state = _WalkState(self.start_skipped)
+
+        stack = [iter(root.children)]
+        while stack and not state.ended:
+            element = next(stack[-1], None)
+            if element is None:
+                stack.pop()
+                continue
+            if not isinstance(element, Tag):
+                continue
+            # Only elements that are not emitted as a block are walked further
+            if self._visit(element, state) and self.recursive:
+                stack.append(iter(element.children))
+
+        return ''.join(state.blocks)
+
+    def _visit(self, element, state):
+        """
+        Processes one element. Returns True if the children of the element should be walked.
+        """
+        name = element.name
+
+        if self.skip_element is not None and self.skip_element(element):
+            if self.skip_ends_article:
+                state.ended = True
+            return False
+
+        if name in self.header_tags:
+            self._header(element, state)
+            return False
+
+        if name == 'p':
+            if not state.skip:
+                self._paragraph(element, state)
+            return False
+
+        if name in self.list_tags:
+            if not state.skip:
+                self._items(element, ('li',), state, self.stop_list_items, self.direct_list_items)
+            return False
+
+        if name in self.row_tags:
+            if not state.skip:
+                self._items(element, ('th', 'td'), state)
+            return False
+
+        for match, stop_substrings in self.extra_blocks:
+            if match(element):
+                if not state.skip:
+                    text = element_text(element)
+                    if _matches_any(text, stop_substrings):
+                        state.skip = True
+                    elif text:
+                        state.blocks.append(text + '\n\n')
+                return False
+
+        return True
+
+    def _header(self, element, state):
+        if self.wanted_header is not None and not self.wanted_header(element):
+            state.skip = True
+            return
+
+        text = element_text(element, separator=self.header_separator)
+        if self.stop_headers and _matches_any(text, self.stop_headers, self.exact_headers):
+            if self.stop_mode == 'end':
+                state.ended = True
+            elif self.stop_mode == 'section':
+                state.skip = True
+            return
+
+        state.skip = False
+        if text:
+            state.blocks.append(text + self.header_suffix)
+
+    def _paragraph(self, element, state):
+        if self.skip_paragraph is not None and self.skip_paragraph(element):
+            return
+
+        text = element_text(element, exclude=self.paragraph_exclude_tags)
+        if self.stop_paragraphs and _matches_any(text, self.stop_paragraphs):
+            state.skip = True
+            return
+        if self.omit_paragraphs and _matches_any(text, self.omit_paragraphs, self.exact_paragraphs):
+            return
+
+        if text:
+            state.blocks.append(text + '\n\n')
+
+    def _items(self, element, item_tags, state, stop_substrings=(), direct_only=False):
+        for item in _iter_items(element, item_tags, direct_only):
+            text = element_text(item)
+            if stop_substrings and _matches_any(text, stop_substrings):
+                state.skip = True
+                continue
+            if text:
+                state.blocks.append(text + self.item_suffix)
@@ -9,4 +9,8 @@ if __name__ == '__main__':
     data = parser.fetch_data(url)
     print(data)
 
+    # To re-run the extraction on a saved page without network access:
+    # with open('Please enter a saved html file path here', 'rb') as html_file:
+    #     print(parser.extract(html_file.read(), url))
+
     
\ No newline at end of file
@@ -1,5 +1,7 @@
 # To manually check access for specific URLs, run the script from this path C:\Users\yourusername\Osint_Scraper in the command line:
 # python -m utils.access_checker
+# To check a list of URLs concurrently and get a JSON report (one URL per line, "-" reads stdin):
+# python -m utils.access_checker --file urls.txt --output report.json
 
 import urllib.robotparser
 from urllib.parse import urlparse
@@ -7,8 +9,15 @@ import requests
 import random
 from .user_agents import USER_AGENTS  # Import user_agents file
 from .logger import setup_logger
+from .robots_cache import RobotsCache
 import sys
 import logging
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # Initialize logger
 logger = setup_logger(__name__)
@@ -16,6 +25,14 @@ logger = setup_logger(__name__)
 # Initialize user agent
 user_agent = random.choice(USER_AGENTS)
 
+# Parsed robots.txt rules shared by all checks, downloaded once per host and reused for an hour
+robots_cache = RobotsCache(ttl=3600)
+
+class UnexpectedContentError(Exception):
+    """
+    Raised by fetch_checked with raise_errors when the downloaded page is not HTML.
+    """
+
 def test_robotparser():
     robots_txt = """
     User-agent: *
@@ -63,22 +80,13 @@ def can_fetch(url, user_agent):
         logger.error(f"Invalid URL parsed: scheme='{parsed_url.scheme}', netloc='{parsed_url.netloc}'")
         return False
 
-    robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
-    logger.debug(f"Constructed robots.txt URL: {robots_url}")
-
-    # Determine if fetching is allowed
-    try:
-        response = requests.get(robots_url, headers={'User-Agent': user_agent}, timeout=10)
-        response.raise_for_status()
-        robots_content = response.text
-        logger.debug(f"Fetched robots.txt from {robots_url}:\n{robots_content}")
-        
-        rp = urllib.robotparser.RobotFileParser()
-        rp.set_url(robots_url)
-        rp.read()
-    except requests.exceptions.RequestException as e:
-        logger.warning(f"Failed to fetch robots.txt from {robots_url}: {e}")
+    # Get the robots.txt rules of the host (downloaded and parsed once per host, see robots_cache.py)
+    robots = robots_cache.get(url, user_agent)
+    logger.debug(f"robots.txt URL: {robots.robots_url}")
+    if robots.parser is None:
+        logger.warning(f"No robots.txt rules for {url}: {robots.error}")
         return False
+    rp = robots.parser
     
     # Extract the path from the URL
     path = parsed_url.path or '/'
@@ -105,16 +113,20 @@ print(f"Can fetch '{url}' with user-agent '{user_agent}': {allowed}")
 exit()
 '''
 
-def test_access(url, user_agent):
+def fetch_checked(url, user_agent, fetch=None, raise_errors=False):
     """
-    Tests access to the given URL by making a GET request with custom headers.
+    Downloads the given URL and checks that the response is an HTML page.
 
     Parameters:
         url (str): The URL to test.
         user_agent (str): The user agent string to identify the crawler.
+        fetch (callable): Function that downloads a URL and returns its requests.Response (e.g. a parser's get method).
+            By default a GET request with browser-like headers is made.
+        raise_errors (bool): Raise the download error, or UnexpectedContentError for a page that is not HTML,
+            instead of returning None.
 
     Returns:
-        bool: True if access is successful (status code 200), False otherwise.
+        requests.Response: The response if access is successful, None otherwise.
     """
 
     # Set up custom headers to mimic a real browser
@@ -126,9 +138,12 @@ def test_access(url, user_agent):
         'Referer': 'https://www.google.com/' 
     }
 
-    # Make a GET request with a timeout of 30 seconds
+    # Make a GET request with a timeout of 10 seconds
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        if fetch is not None:
+            response = fetch(url)
+        else:
+            response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()  # Raises HTTPError for bad responses (4xx, 5xx)
 
         logger.debug(f"Response headers for {url}: {response.headers}")
@@ -138,31 +153,56 @@ def test_access(url, user_agent):
         content_type = response.headers.get('Content-Type', '')
         if 'text/html' not in content_type:
             logger.warning(f"Unexpected Content-Type for {url}: {content_type}")
-            return False
+            if raise_errors:
+                raise UnexpectedContentError(f"Unexpected Content-Type for {url}: {content_type}")
+            return None
 
         logger.info(f"Access to {url} successful with status code {response.status_code}.")
-        return True
+        return response
 
     # Check for HTTP errors & unexpected content and logs the outcome
     except requests.exceptions.HTTPError as http_err:
         logger.error(f"HTTP error occurred while accessing {url}: {http_err}")
+        if raise_errors:
+            raise
     except requests.exceptions.Timeout:
         logger.error(f"Timeout occurred while accessing {url}.")
+        if raise_errors:
+            raise
     except requests.exceptions.RequestException as req_err:
         logger.error(f"Error occurred while accessing {url}: {req_err}")
+        if raise_errors:
+            raise
 
-    return False
+    return None
 
-def is_scraping_allowed(url, user_agent):
+def test_access(url, user_agent):
     """
-    Combines robots.txt compliance and a test HTTP request to determine if scraping is allowed.
+    Tests access to the given URL by making a GET request with custom headers.
+
+    Parameters:
+        url (str): The URL to test.
+        user_agent (str): The user agent string to identify the crawler.
+
+    Returns:
+        bool: True if access is successful (status code 200), False otherwise.
+    """
+    return fetch_checked(url, user_agent) is not None
+
+def check_and_fetch(url, user_agent, fetch=None, raise_errors=False):
+    """
+    Combines robots.txt compliance and an HTTP request to determine if scraping is allowed,
+    and keeps the downloaded page so it can be handed to the parser instead of being downloaded again.
 
     Parameters:
         url (str): The URL to check.
         user_agent (str): The user agent string to identify the crawler.
+        fetch (callable): Function that downloads a URL and returns its requests.Response (e.g. a parser's get method).
+        raise_errors (bool): Raise download errors and UnexpectedContentError (see fetch_checked), so that
+            None only means robots.txt disallows the URL.
 
     Returns:
-        bool: True if scraping is allowed and accessible, False otherwise.
+        requests.Response: The downloaded page if scraping is allowed and accessible, None otherwise.
     """
     
     logger.info(f"Starting scraping check for: {url} with User-Agent: {user_agent}")
@@ -170,24 +210,281 @@ def is_scraping_allowed(url, user_agent):
     # Call can_fetch to check robots.txt
     if not can_fetch(url, user_agent):
         logger.info(f"Scraping disallowed by robots.txt for {url}.")
-        return False
+        return None
     
     logger.info(f"robots.txt allows scraping for {url}. Proceeding to test access.")
 
-    # If allowed, call test_access to verify accessibility
-    if not test_access(url, user_agent):
+    # If allowed, download the page to verify accessibility
+    response = fetch_checked(url, user_agent, fetch, raise_errors)
+    if response is None:
         logger.info(f"Access to {url} is blocked or returned unexpected content.")
-        return False
+        return None
     
     logger.info(f"Scraping is allowed and access is confirmed for {url}.")
+    return response
 
+def is_scraping_allowed(url, user_agent):
+    """
+    Combines robots.txt compliance and a test HTTP request to determine if scraping is allowed.
+
+    Parameters:
+        url (str): The URL to check.
+        user_agent (str): The user agent string to identify the crawler.
+
+    Returns:
+        bool: True if scraping is allowed and accessible, False otherwise.
+    """
     # Return True only if both checks pass
-    return True
+    return check_and_fetch(url, user_agent) is not None
+
+def split_urls(text):
+    """
+    Splits text into URLs separated by commas, spaces or new lines. Lines starting with # are skipped.
+
+    Parameters:
+        text (str): The text to split.
+
+    Returns:
+        list: The URLs.
+    """
+    urls = []
+    for line in text.splitlines():
+        if line.strip().startswith('#'):
+            continue
+        urls.extend(url.strip() for url in line.replace(',', ' ').split() if url.strip())
+    return urls
+
+def add_scheme(url, session=requests):
+    """
+    Adds https:// to a URL without a scheme if the site answers over HTTPS, and http:// otherwise.
+
+    Parameters:
+        url (str): The URL to complete.
+        session: The requests session (or the requests module) used for the HTTPS probe.
+
+    Returns:
+        str: The URL with a scheme.
+    """
+    if url.startswith(('http://', 'https://')):
+        return url
+
+    # Try HTTPS first
+    test_https = f"https://{url}"
+    try:
+        resp = session.head(test_https, timeout=5)
+        if resp.status_code < 400:
+            logger.debug(f"HTTPS is supported. Updated URL to: {test_https}")
+            return test_https
+        logger.debug(f"HTTPS responded with status {resp.status_code}. Falling back to HTTP: http://{url}")
+    except requests.exceptions.RequestException:
+        # If HTTPS fails, fall back to HTTP
+        logger.debug(f"HTTPS request failed. Falling back to HTTP: http://{url}")
+    return f"http://{url}"
+
+def probe_access(url, user_agent, session, timeout=10):
+    """
+    Tests access to the given URL without downloading the page: a HEAD request, or a GET request that reads only
+    the response headers when the site does not answer HEAD properly.
+
+    Parameters:
+        url (str): The URL to test.
+        user_agent (str): The user agent string to identify the crawler.
+        session (requests.Session): The session used for the request.
+        timeout (float): Timeout of the request in seconds.
+
+    Returns:
+        dict: The status code, Content-Type, the request method used and the error, if any.
+    """
+    headers = {
+        'User-Agent': user_agent,
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Referer': 'https://www.google.com/'
+    }
+    result = {'status': None, 'content_type': None, 'method': 'HEAD', 'error': None}
+
+    try:
+        response = session.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+        result['status'] = response.status_code
+        result['content_type'] = response.headers.get('Content-Type', '')
+    except requests.exceptions.RequestException as e:
+        result['error'] = str(e)
+
+    # Many sites refuse HEAD or answer it without a Content-Type, the GET is closed after the headers
+    if result['error'] or result['status'] >= 400 or not result['content_type']:
+        result.update(method='GET', error=None)
+        try:
+            with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+                result['status'] = response.status_code
+                result['content_type'] = response.headers.get('Content-Type', '')
+        except requests.exceptions.RequestException as e:
+            result['error'] = str(e)
+
+    return result
+
+class HostLimiter:
+    """
+    Limits the number of checks running at the same time against one host.
+
+    Parameters:
+        per_host (int): Number of concurrent checks allowed per host.
+    """
+
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self.semaphores = {}
+        self.lock = threading.Lock()
+
+    def slot(self, url):
+        """
+        Returns:
+            threading.Semaphore: The semaphore of the host of the URL, to use in a with block.
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self.semaphores[host]
+
+def check_url(url, user_agent, session, limiter, timeout=10):
+    """
+    Checks robots.txt and access for one URL of a batch.
+
+    Parameters:
+        url (str): The URL to check, with or without a scheme.
+        user_agent (str): The user agent string to identify the crawler.
+        session (requests.Session): The session used for the requests.
+        limiter (HostLimiter): The per-host limit of concurrent checks.
+        timeout (float): Timeout of each request in seconds.
+
+    Returns:
+        dict: The report entry of the URL.
+    """
+    started = time.perf_counter()
+    entry = {'input': url, 'url': url, 'allowed': False, 'robots_allowed': None, 'status': None,
+             'content_type': None, 'method': None, 'reason': None}
+
+    with limiter.slot(url if '://' in url else f"http://{url}"):
+        url = entry['url'] = add_scheme(url, session)
+        entry['robots_allowed'] = can_fetch(url, user_agent)
+        if not entry['robots_allowed']:
+            robots = robots_cache.get(url, user_agent)
+            entry['reason'] = 'disallowed by robots.txt' if robots.parser else f"robots.txt unavailable: {robots.error}"
+        else:
+            probe = probe_access(url, user_agent, session, timeout)
+            entry.update(status=probe['status'], content_type=probe['content_type'], method=probe['method'])
+            if probe['error']:
+                entry['reason'] = probe['error']
+            elif probe['status'] >= 400:
+                entry['reason'] = f"HTTP {probe['status']}"
+            elif 'text/html' not in probe['content_type']:
+                entry['reason'] = f"Content-Type {probe['content_type']}"
+            else:
+                entry['allowed'] = True
+
+    entry['seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"Batch check of {url}: {'allowed' if entry['allowed'] else entry['reason']}")
+    return entry
+
+def check_urls(urls, user_agent, workers=16, per_host=2, timeout=10):
+    """
+    Checks many URLs concurrently, with at most per_host checks at a time against one host.
+
+    Parameters:
+        urls (list): The URLs to check.
+        user_agent (str): The user agent string to identify the crawler.
+        workers (int): Number of checks running at the same time.
+        per_host (int): Number of checks running at the same time against one host.
+        timeout (float): Timeout of each request in seconds.
+
+    Returns:
+        list: The report entries, in the order of the URLs.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max(workers, 10), pool_maxsize=per_host)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    limiter = HostLimiter(per_host)
+
+    # URLs are submitted host by host in turns, so the workers are not all waiting for the same host
+    by_host = {}
+    for index, url in enumerate(urls):
+        by_host.setdefault(urlparse(url if '://' in url else f"http://{url}").netloc, []).append(index)
+    order = []
+    while by_host:
+        for host in list(by_host):
+            order.append(by_host[host].pop(0))
+            if not by_host[host]:
+                del by_host[host]
+
+    results = [None] * len(urls)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {index: executor.submit(check_url, urls[index], user_agent, session, limiter, timeout)
+                   for index in order}
+        for index, future in futures.items():
+            results[index] = future.result()
+    session.close()
+    return results
+
+def run_batch(args):
+    """
+    Checks the URLs of a file, the command line or stdin and writes a JSON report.
+
+    Parameters:
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+    urls = list(args.urls)
+    if args.file == '-':
+        urls += split_urls(sys.stdin.read())
+    elif args.file:
+        with open(args.file, 'r', encoding='utf-8') as urls_file:
+            urls += split_urls(urls_file.read())
+    if not urls:
+        print("No URLs provided. Exiting.")
+        sys.exit(1)
+
+    # The console log would be mixed with a report written to stdout; the log file keeps it
+    if not args.output:
+        for handler in logger.handlers:
+            if not isinstance(handler, logging.FileHandler):
+                handler.setLevel(logging.ERROR)
+
+    started = time.perf_counter()
+    results = check_urls(urls, user_agent, args.workers, args.per_host, args.timeout)
+    report = {
+        'user_agent': user_agent,
+        'checked': len(results),
+        'allowed': sum(entry['allowed'] for entry in results),
+        'seconds': round(time.perf_counter() - started, 3),
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=4)
+        print(f"Checked {report['checked']} URLs in {report['seconds']} s, {report['allowed']} allowed. "
+              f"Report: {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
 
 def main():
     """
     Main function to perform access checks on provided URLs.
     """
+    arg_parser = argparse.ArgumentParser(description="Check robots.txt and access for URLs.")
+    arg_parser.add_argument('urls', nargs='*', help="URLs to check")
+    arg_parser.add_argument('--file', help="file with the URLs to check, one per line ('-' reads stdin)")
+    arg_parser.add_argument('--output', help="path of the JSON report (printed to stdout by default)")
+    arg_parser.add_argument('--workers', type=int, default=16, help="number of concurrent checks")
+    arg_parser.add_argument('--per-host', type=int, default=2, help="number of concurrent checks per host")
+    arg_parser.add_argument('--timeout', type=float, default=10, help="timeout of each request in seconds")
+    args = arg_parser.parse_args()
+
+    if args.urls or args.file:
+        run_batch(args)
+        return
+
     # Prompt user to enter URLs separated by spaces or commas
     input_urls = input("Enter URLs separated by spaces or commas: ").strip()
 
@@ -196,10 +493,7 @@ def main():
         sys.exit(1)
 
     # Split the input into a list of URLs
-    if ',' in input_urls:
-        urls = [url.strip() for url in input_urls.split(',') if url.strip()]
-    else:
-        urls = [url.strip() for url in input_urls.split() if url.strip()]
+    urls = split_urls(input_urls)
 
     if not urls:
         print("No valid URLs provided. Exiting.")
@@ -209,21 +503,7 @@ def main():
 
     for url in urls:
         # Add scheme if missing
-        if not url.startswith(('http://', 'https://')):
-            # Try HTTPS first
-            test_https = f"https://{url}"
-            try:
-                resp = requests.head(test_https, timeout=5)
-                if resp.status_code < 400:
-                    url = test_https
-                    logger.debug(f"HTTPS is supported. Updated URL to: {url}")
-                else:
-                    url = f"http://{url}"
-                    logger.debug(f"HTTPS responded with status {resp.status_code}. Falling back to HTTP: {url}")
-            except requests.exceptions.RequestException:
-                # If HTTPS fails, fall back to HTTP
-                url = f"http://{url}"
-                logger.debug(f"HTTPS request failed. Falling back to HTTP: {url}")
+        url = add_scheme(url)
         logger.info(f"Checking access for URL: {url}")
         allowed = is_scraping_allowed(url, user_agent)
         if allowed:
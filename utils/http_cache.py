@@ -0,0 +1,141 @@
+# This file defines the on-disk cache of fetched pages used by the shared fetch service.
+# A page is stored with its validators (ETag / Last-Modified). The next request of the same URL sends them
+# as If-None-Match / If-Modified-Since, and a 304 Not Modified answer is served from disk, so re-crawling an
+# unchanged article costs a header exchange instead of a full page download.
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Response headers kept with a cached page
+_STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def _write_atomic(path, data):
+    """
+    Writes a file through a temporary file in the same folder, so readers never see a partial file.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class HTTPCache:
+    """
+    Disk cache of page bodies and their validators, one compressed body file and one metadata file per URL.
+
+    Parameters:
+        directory (str): Folder of the cache (created if missing).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        folder = os.path.join(self.directory, key[:2])
+        return os.path.join(folder, key + '.json'), os.path.join(folder, key + '.body')
+
+    def lookup(self, url):
+        """
+        Returns:
+            dict: The metadata of the cached page of the URL, or None if the URL is not cached.
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as meta_file:
+                entry = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+        entry['body_path'] = body_path
+        return entry
+
+    @staticmethod
+    def validators(entry):
+        """
+        Returns:
+            dict: The conditional request headers that revalidate a cached page.
+        """
+        headers = {}
+        if entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if entry['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def store(self, url, response):
+        """
+        Stores a 200 response that has validators. Other responses are not cached.
+
+        Parameters:
+            url (str): The requested URL.
+            response (requests.Response): The response of the request.
+
+        Returns:
+            bool: True if the response was stored.
+        """
+        if response.status_code != 200:
+            return False
+        if 'no-store' in response.headers.get('Cache-Control', ''):
+            return False
+        if not (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            return False
+
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        entry = {
+            'url': response.url,
+            'headers': {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers},
+            'stored_at': time.time()
+        }
+        # The body is written first, so a metadata file always points to a complete body
+        _write_atomic(body_path, zlib.compress(response.content))
+        _write_atomic(meta_path, json.dumps(entry).encode('utf-8'))
+        return True
+
+    def cached_response(self, entry, not_modified):
+        """
+        Builds the response of a revalidated page from its cached body.
+
+        Parameters:
+            entry (dict): The metadata returned by lookup.
+            not_modified (requests.Response): The 304 response of the revalidation request.
+
+        Returns:
+            requests.Response: A 200 response with the cached body, or None if the body file is missing.
+        """
+        try:
+            with open(entry['body_path'], 'rb') as body_file:
+                body = zlib.decompress(body_file.read())
+        except (OSError, zlib.error):
+            return None
+
+        headers = CaseInsensitiveDict(entry['headers'])
+        # A 304 can carry updated validators
+        for name in ('ETag', 'Last-Modified'):
+            if not_modified.headers.get(name):
+                headers[name] = not_modified.headers[name]
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = entry['url']
+        response.headers = headers
+        response.encoding = get_encoding_from_headers(headers)
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response._content = body
+        response.from_cache = True
+        return response
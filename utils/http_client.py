@@ -0,0 +1,138 @@
+# This file defines the shared HTTP fetch service used by the parsers.
+# It keeps one requests session with keep-alive connection pools per host, so repeated requests
+# to the same vendor site reuse warm connections instead of doing a new TCP+TLS handshake each time.
+
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from utils.http_cache import HTTPCache
+from utils.resilience import RetryPolicy, CircuitBreaker, call_with_retries, retry_after_seconds
+
+# Status codes of transient server failures that are retried
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Advertise brotli only when a decoder is installed, otherwise the response could not be decoded
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    _ACCEPT_ENCODING = 'gzip, deflate'
+
+# Headers to mimic a browser, sent with every request unless a parser overrides them
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': _ACCEPT_ENCODING,
+    'Connection': 'keep-alive'
+}
+
+
+class FetchService:
+    """
+    Shared HTTP client with pooled keep-alive connections, default headers, timeouts and retries.
+
+    Parameters:
+        timeout (float): Read timeout in seconds.
+        connect_timeout (float): Connection timeout in seconds.
+        retries (int): Number of retries for connection errors, timeouts and retryable status codes.
+        backoff_factor (float): Base delay in seconds between retries (doubled after each retry, with jitter).
+        max_backoff (float): Longest delay in seconds between retries. A longer Retry-After fails the request.
+        failure_threshold (int): Consecutive failures of a host that stop requests to it (circuit breaker).
+        reset_timeout (float): Seconds requests to a failing host are refused before a trial request.
+        pool_connections (int): Number of per-host connection pools kept alive.
+        pool_maxsize (int): Maximum number of connections kept open to a single host.
+        headers (dict): Headers merged over DEFAULT_HEADERS.
+        cache_dir (str): Folder of the on-disk page cache revalidated with ETag / Last-Modified. No cache if None.
+        proxies (dict): Proxy URL per scheme, e.g. {'http': 'http://127.0.0.1:8081'}.
+    """
+
+    def __init__(self, timeout=10, connect_timeout=5, retries=2, backoff_factor=0.5, max_backoff=30,
+                 failure_threshold=5, reset_timeout=60, pool_connections=32, pool_maxsize=8, headers=None,
+                 cache_dir=None, proxies=None):
+        self.timeout = (connect_timeout, timeout)
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        if proxies:
+            self.session.proxies.update(proxies)
+
+        # Retries and the per-host circuit breaker are handled in get() (see resilience.py)
+        self.retry_policy = RetryPolicy(retries, backoff_factor, max_backoff, max_retry_after=max_backoff)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, name='fetch')
+
+        # pool_block makes callers wait for a free connection instead of opening extra ones,
+        # which caps the number of concurrent connections per host at pool_maxsize
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def check_circuit(self, url):
+        """
+        Raises CircuitOpenError if requests to the host of the URL are refused after repeated failures.
+        Once the host may be tried again, the trial request is left to get().
+        """
+        self.breaker.peek(urlparse(url).hostname)
+
+    def get(self, url, headers=None, **kwargs):
+        """
+        Makes a GET request through the shared session.
+        Connection errors, timeouts and 429/5xx answers are retried with a jittered exponential backoff,
+        or after the delay of a Retry-After header.
+
+        Parameters:
+            url (str): The URL to fetch.
+            headers (dict): Extra headers for this request, merged over the session headers.
+
+        Returns:
+            requests.Response: The response. An HTTPError is raised for 4xx/5xx status codes.
+                Pages served from the cache after a 304 answer have from_cache set to True.
+                CircuitOpenError is raised without a request while the host is failing.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return call_with_retries(lambda: self._get_once(url, headers, **kwargs), self.retry_policy,
+                                 _classify_error, key=urlparse(url).hostname, breaker=self.breaker,
+                                 description=f"GET {url}")
+
+    def _get_once(self, url, headers, **kwargs):
+
+        # Revalidate the cached copy of the page instead of downloading it again
+        entry = None
+        request_headers = headers
+        if self.cache is not None and not kwargs.get('stream'):
+            entry = self.cache.lookup(url)
+            if entry is not None:
+                request_headers = dict(self.cache.validators(entry), **(headers or {}))
+
+        response = self.session.get(url, headers=request_headers, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            cached = self.cache.cached_response(entry, response)
+            if cached is not None:
+                return cached
+            # The cached body is unreadable, download the page again
+            response = self.session.get(url, headers=headers, **kwargs)
+
+        response.raise_for_status()
+        if self.cache is not None and not kwargs.get('stream'):
+            self.cache.store(url, response)
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+# Tells whether a failed request is worth retrying, and the delay asked for by the server
+def _classify_error(error):
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        if error.response.status_code in RETRY_STATUS_CODES:
+            return True, retry_after_seconds(error.response.headers)
+        return False, None
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)), None
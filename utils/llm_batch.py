@@ -0,0 +1,163 @@
+# This file runs GPT requests through the Azure OpenAI Batch API, for backfills that do not need answers quickly.
+# The requests are written to JSONL input files, uploaded and submitted as batch jobs, and the jobs are polled until
+# they end. The answers are then read from the output files and matched to their requests by custom_id.
+
+import json
+import logging
+import os
+import time
+from .metrics import metrics
+
+# Batch statuses after which a batch job does not change any more
+FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+def write_batch_input(path, model, prompts):
+    """
+    Writes chat completions requests to a batch input file.
+
+    Parameters:
+        path (str): Path of the JSONL file.
+        model (str): Batch deployment name sent as the model of the requests.
+        prompts (dict): Prompt of every request, keyed by its custom_id.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as input_file:
+        for custom_id, prompt in prompts.items():
+            request = {
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': '/chat/completions',
+                'body': {'model': model, 'messages': [{'role': 'user', 'content': prompt}]}
+            }
+            input_file.write(json.dumps(request, ensure_ascii=False) + '\n')
+
+
+def read_batch_output(text):
+    """
+    Reads the answers of a batch output or error file.
+
+    Parameters:
+        text (str): Content of the JSONL file.
+
+    Returns:
+        dict: For every custom_id, the message content of the answer, or None if the request failed.
+    """
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get('response') or {}
+        body = response.get('body') or {}
+        if record.get('error') or response.get('status_code') != 200 or not body.get('choices'):
+            logging.warning(f"Batch request {record.get('custom_id')} failed: "
+                            f"{record.get('error') or body.get('error') or response.get('status_code')}")
+            results[record.get('custom_id')] = None
+            continue
+        usage = body.get('usage') or {}
+        metrics.increment('llm_batch_prompt_tokens_total', usage.get('prompt_tokens', 0))
+        metrics.increment('llm_batch_completion_tokens_total', usage.get('completion_tokens', 0))
+        results[record.get('custom_id')] = body['choices'][0]['message']['content']
+    return results
+
+
+class BatchRunner:
+    """
+    Submits GPT requests as Azure OpenAI batch jobs and collects their answers.
+
+    Parameters:
+        client (AzureOpenAI): Client of the endpoint with the batch deployment.
+        model (str): Batch deployment name.
+        work_dir (str): Folder of the batch input files.
+        poll_interval (float): Seconds between two status checks of a batch job.
+        max_requests (int): Most requests in one batch job; more requests are split over several jobs.
+        completion_window (str): Time the service has to finish a batch job.
+    """
+
+    def __init__(self, client, model, work_dir, poll_interval=60, max_requests=50000, completion_window='24h'):
+        self.client = client
+        self.model = model
+        self.work_dir = work_dir
+        self.poll_interval = poll_interval
+        self.max_requests = max_requests
+        self.completion_window = completion_window
+
+    def submit(self, prompts, name):
+        """
+        Uploads the requests as a batch input file and creates a batch job.
+
+        Parameters:
+            prompts (dict): Prompt of every request, keyed by its custom_id.
+            name (str): Name of the input file.
+
+        Returns:
+            Batch: The created batch job.
+        """
+        path = os.path.join(self.work_dir, f"{name}.jsonl")
+        write_batch_input(path, self.model, prompts)
+        with open(path, 'rb') as input_file:
+            uploaded = self.client.files.create(file=input_file, purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint='/chat/completions',
+            completion_window=self.completion_window
+        )
+        logging.info(f"Submitted batch {batch.id} with {len(prompts)} requests ({path}).")
+        return batch
+
+    def wait(self, batch):
+        """
+        Polls a batch job until it ends.
+
+        Returns:
+            Batch: The ended batch job.
+        """
+        while batch.status not in FINAL_STATUSES:
+            time.sleep(self.poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            if counts:
+                logging.info(f"Batch {batch.id} is {batch.status}: {counts.completed}/{counts.total} requests done, "
+                             f"{counts.failed} failed.")
+        return batch
+
+    def collect(self, batch):
+        """
+        Returns:
+            dict: For every custom_id of an ended batch job, the message content of its answer, or None if it failed.
+                Requests missing from the output (e.g. of an expired job) are not in the dict.
+        """
+        if batch.status != 'completed':
+            logging.warning(f"Batch {batch.id} ended with status {batch.status}.")
+        results = {}
+        for file_id in (batch.error_file_id, batch.output_file_id):
+            if file_id:
+                results.update(read_batch_output(self.client.files.content(file_id).text))
+        return results
+
+    def run(self, prompts, name='batch'):
+        """
+        Sends all requests as one or more batch jobs, submitted together, and waits for their answers.
+
+        Parameters:
+            prompts (dict): Prompt of every request, keyed by its custom_id.
+            name (str): Prefix of the input file names.
+
+        Returns:
+            dict: For every custom_id, the message content of its answer, or None if the request failed or
+                did not run.
+        """
+        custom_ids = list(prompts)
+        batches = []
+        for part, start in enumerate(range(0, len(custom_ids), self.max_requests)):
+            chunk = {custom_id: prompts[custom_id] for custom_id in custom_ids[start:start + self.max_requests]}
+            batches.append(self.submit(chunk, f"{name}_{part}"))
+
+        results = dict.fromkeys(custom_ids)
+        for batch in batches:
+            batch = self.wait(batch)
+            results.update(self.collect(batch))
+        return results
@@ -0,0 +1,125 @@
+# This file defines a persistent cache of GPT responses stored in SQLite.
+# A response is stored under a hash of the model name, API version, rendered prompt and article text, so
+# re-running the scraper on an unchanged article with the same prompt reuses the stored response instead of
+# calling the model again. The cache keeps at most max_entries responses and evicts the least recently used.
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+def make_cache_key(model, api_version, prompt, article_text):
+    """
+    Builds the cache key of a GPT request.
+
+    Parameters:
+        model (str): The GPT model (deployment) name.
+        api_version (str): The API version.
+        prompt (str): The rendered prompt sent to the model.
+        article_text (str): The article text inserted in the prompt.
+
+    Returns:
+        str: Hex SHA-256 digest of the request fields.
+    """
+    digest = hashlib.sha256()
+    for field in (model, api_version, prompt, article_text):
+        encoded = (field or '').encode('utf-8')
+        # Length prefix, so different splits of the same characters never give the same key
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Size-bounded cache of GPT responses, shared by the GPT worker threads.
+
+    Parameters:
+        path (str): Path of the SQLite database file (created if missing).
+        max_entries (int): Maximum number of stored responses. The least recently used ones are evicted.
+    """
+
+    def __init__(self, path, max_entries=10000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.connection.commit()
+
+    def get(self, key):
+        """
+        Returns:
+            str: The cached response of the key, or None if it is not cached.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.connection.commit()
+            return row[0]
+
+    def put(self, key, response):
+        """
+        Stores a response and evicts the least recently used responses above max_entries.
+
+        Parameters:
+            key (str): The cache key (see make_cache_key).
+            response (str): The GPT response text.
+        """
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+
+            (entries,) = self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if entries > self.max_entries:
+                evicted = self.connection.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (entries - self.max_entries,)
+                ).rowcount
+                self.evictions += evicted
+            self.connection.commit()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hits, misses, hit rate and evictions of this run, and the number of stored responses.
+        """
+        with self.lock:
+            (entries,) = self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': entries
+            }
+
+    def close(self):
+        logging.info(f"GPT response cache: {self.stats()}")
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,225 @@
+# This file defines the GPT client used by the scraper.
+# The requests are made by an AsyncAzureOpenAI client running on an event loop in a background thread, so many
+# completions are in flight at once while the pipeline workers simply wait for their own result. Before a request
+# is sent, its tokens (prompt estimate + expected completion) are taken from tokens- and requests-per-minute budgets
+# matching the deployment quota, and the number of requests in flight follows an AIMD rule: it grows by about one
+# per round of successful requests and is halved when the service answers 429.
+
+import asyncio
+import logging
+import threading
+import time
+import httpx
+import openai
+from openai import AsyncAzureOpenAI, RateLimitError
+from .metrics import metrics
+from .resilience import retry_after_seconds
+
+
+def estimate_tokens(text):
+    """
+    Returns:
+        int: A rough token count of a text (about 4 characters per token).
+    """
+    return max(1, len(text) // 4)
+
+
+def classify_llm_error(error):
+    """
+    Tells whether a failed GPT request is worth retrying (rate limits, timeouts, connection and server errors).
+
+    Returns:
+        tuple: (retryable, retry_after), retry_after being the delay in seconds asked for by the service or None.
+    """
+    if isinstance(error, (openai.RateLimitError, openai.InternalServerError)):
+        return True, retry_after_seconds(error.response.headers)
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409), retry_after_seconds(error.response.headers)
+    return isinstance(error, openai.APIConnectionError), None
+
+
+class _Budget:
+    """
+    Per-minute quota refilled continuously, allowing bursts of a tenth of the quota (the service checks the
+    quota over short windows too).
+    """
+
+    def __init__(self, per_minute):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, per_minute / 10)
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount):
+        """
+        Returns:
+            float: Seconds until the amount fits in the budget (0 if it fits now).
+        """
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.available) / self.rate)
+
+    def take(self, amount):
+        self._refill()
+        self.available -= amount
+
+
+class _AIMDLimit:
+    """
+    Limit of concurrent requests with additive increase and multiplicative decrease.
+    """
+
+    def __init__(self, initial, minimum, maximum, cooldown=2.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cooldown = cooldown
+        self.inflight = 0
+        self.last_decrease = 0.0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.inflight < int(self.limit))
+            self.inflight += 1
+
+    async def release(self, throttled):
+        async with self.condition:
+            self.inflight -= 1
+            if throttled:
+                # One 429 burst halves the limit once, not once per throttled request
+                now = time.monotonic()
+                if now - self.last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self.last_decrease = now
+                    logging.info(f"GPT requests throttled, concurrency lowered to {int(self.limit)}.")
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+
+class AsyncLLMClient:
+    """
+    Azure OpenAI chat completions client keeping many requests in flight within the deployment quota.
+
+    Parameters:
+        endpoint (str): Azure OpenAI endpoint.
+        api_key (str): API key.
+        api_version (str): API version.
+        tpm_limit (int): Tokens per minute of the deployment, 0 for no pacing.
+        rpm_limit (int): Requests per minute of the deployment, 0 for no pacing.
+        max_concurrency (int): Most requests in flight.
+        initial_concurrency (int): Requests in flight at start, raised while no request is throttled.
+        min_concurrency (int): Fewest requests in flight after throttling.
+        completion_tokens (int): Expected completion tokens of a request, counted in the token budget.
+        timeout (float): Timeout of a request in seconds.
+        verify_ssl (bool): Verify the TLS certificate of the endpoint.
+        http_client (httpx.AsyncClient): Client to use instead of a new one.
+    """
+
+    def __init__(self, endpoint, api_key, api_version, tpm_limit=0, rpm_limit=0, max_concurrency=32,
+                 initial_concurrency=4, min_concurrency=1, completion_tokens=500, timeout=120, verify_ssl=True,
+                 http_client=None):
+        self.completion_tokens = completion_tokens
+        self.max_concurrency = max_concurrency
+        self.tokens = _Budget(tpm_limit) if tpm_limit else None
+        self.requests = _Budget(rpm_limit) if rpm_limit else None
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='llm-client', daemon=True)
+        self.thread.start()
+
+        self.limit = self._run(self._make_limit(initial_concurrency, min_concurrency, max_concurrency))
+        # Retries are made by the caller (see resilience.py), with the concurrency already lowered
+        self.client = AsyncAzureOpenAI(
+            azure_endpoint=endpoint,
+            api_key=api_key,
+            api_version=api_version,
+            timeout=timeout,
+            max_retries=0,
+            http_client=http_client or httpx.AsyncClient(
+                verify=verify_ssl,
+                limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+            )
+        )
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def _make_limit(self, initial, minimum, maximum):
+        return _AIMDLimit(min(initial, maximum), minimum, maximum)
+
+    async def _wait_for_budget(self, tokens):
+        # The event loop is the only user of the budgets, no lock is needed
+        while True:
+            delay = max(self.tokens.delay(tokens) if self.tokens else 0.0,
+                        self.requests.delay(1) if self.requests else 0.0)
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        if self.tokens:
+            self.tokens.take(tokens)
+        if self.requests:
+            self.requests.take(1)
+
+    async def _create(self, kwargs):
+        prompt = ''.join(message.get('content') or '' for message in kwargs.get('messages', []))
+        estimate = estimate_tokens(prompt) + kwargs.get('max_tokens', self.completion_tokens)
+
+        queued = time.perf_counter()
+        await self.limit.acquire()
+        throttled = False
+        try:
+            await self._wait_for_budget(estimate)
+            metrics.observe('llm_queue_seconds', time.perf_counter() - queued)
+            response = await self.client.chat.completions.create(**kwargs)
+        except RateLimitError:
+            throttled = True
+            metrics.increment('llm_throttled_total')
+            raise
+        finally:
+            await self.limit.release(throttled)
+
+        # Correct the token budget with the tokens actually used
+        if self.tokens and response.usage:
+            self.tokens.take(response.usage.total_tokens - estimate)
+        return response
+
+    def create(self, **kwargs):
+        """
+        Sends a chat completions request and waits for its response. Can be called from many threads at once.
+
+        Parameters:
+            kwargs: Arguments of chat.completions.create (model, messages, ...).
+
+        Returns:
+            ChatCompletion: The response.
+        """
+        return self._run(self._create(kwargs))
+
+    @property
+    def concurrency(self):
+        return int(self.limit.limit)
+
+    def headroom(self):
+        """
+        Returns:
+            float: Share of the deployment's capacity free now (0 to 1): the smaller of the free request slots and
+                the tokens- and requests-per-minute budgets left. Read without the event loop, so approximate.
+        """
+        shares = [max(0.0, 1 - self.limit.inflight / max(1, int(self.limit.limit)))]
+        for budget in (self.tokens, self.requests):
+            if budget is not None:
+                refilled = budget.available + (time.monotonic() - budget.updated) * budget.rate
+                shares.append(max(0.0, min(budget.capacity, refilled) / budget.capacity))
+        return min(shares)
+
+    def close(self):
+        self._run(self.client.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
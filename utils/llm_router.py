@@ -0,0 +1,165 @@
+# This file spreads the GPT requests over several Azure OpenAI deployments (e.g. in different regions), each with
+# its own quota. Every request goes to the available deployment with the best score: its free capacity (request
+# slots and per-minute budgets left, weighted by the size of its quota) divided by its recent latency. A deployment
+# that answers 429 rests for the Retry-After delay, one that keeps failing is skipped by its circuit breaker, and
+# the request fails over to the next deployment.
+
+import logging
+import threading
+import time
+from .llm_client import AsyncLLMClient, classify_llm_error
+from .metrics import metrics
+from .resilience import CircuitBreaker, CircuitOpenError
+
+# Weight of the newest latency in the moving average of a deployment
+LATENCY_SMOOTHING = 0.2
+
+# Rest in seconds of a deployment answering 429 without Retry-After
+DEFAULT_THROTTLE_REST = 5.0
+
+
+class Deployment:
+    """
+    One Azure OpenAI deployment of the router.
+
+    Parameters:
+        name (str): Name of the deployment in logs and metrics.
+        deployment (str): Deployment name sent as the model of the requests.
+        client (AsyncLLMClient): Client of the deployment's endpoint.
+        weight (float): Relative size of the deployment's quota.
+    """
+
+    def __init__(self, name, deployment, client, weight):
+        self.name = name
+        self.deployment = deployment
+        self.client = client
+        self.weight = weight
+        self.latency = None  # Moving average of the request latency in seconds
+        self.resting_until = 0.0
+
+
+class LLMRouter:
+    """
+    Routes chat completions requests over several deployments. Has the create() interface of AsyncLLMClient.
+
+    Parameters:
+        deployments (list): Settings of every deployment: endpoint and deployment, and optionally name, api_key,
+            api_version and the AsyncLLMClient settings (tpm_limit, rpm_limit, max_concurrency, ...).
+        api_key (str): API key of the deployments without their own.
+        defaults (dict): AsyncLLMClient settings and api_version shared by the deployments.
+        failure_threshold (int): Consecutive failures after which a deployment is skipped...
+        reset_timeout (float): ...for this many seconds.
+    """
+
+    def __init__(self, deployments, api_key, defaults=None, failure_threshold=3, reset_timeout=60):
+        if not deployments:
+            raise ValueError("No GPT deployment configured.")
+        self.deployments = []
+        for settings in deployments:
+            settings = dict(defaults or {}, **settings)
+            name = settings.pop('name', None) or settings['deployment']
+            deployment = settings.pop('deployment')
+            client = AsyncLLMClient(settings.pop('endpoint'), settings.pop('api_key', api_key),
+                                    settings.pop('api_version'), **settings)
+            weight = settings.get('tpm_limit') or settings.get('max_concurrency', 32) * 1000
+            self.deployments.append(Deployment(name, deployment, client, weight))
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, name='deployment')
+        self.lock = threading.Lock()
+
+    @property
+    def max_concurrency(self):
+        return sum(deployment.client.max_concurrency for deployment in self.deployments)
+
+    @property
+    def concurrency(self):
+        return sum(deployment.client.concurrency for deployment in self.deployments)
+
+    def _score(self, deployment, typical_latency):
+        latency = deployment.latency if deployment.latency is not None else typical_latency
+        return deployment.weight * deployment.client.headroom() / latency
+
+    def _candidates(self):
+        """
+        Returns:
+            list: The deployments not resting and not skipped by their circuit breaker, best score first.
+                The resting ones follow, soonest available first, as a last resort.
+        """
+        now = time.monotonic()
+        with self.lock:
+            known = [deployment.latency for deployment in self.deployments if deployment.latency is not None]
+            # Deployments not used yet are scored with the best known latency, so they get tried
+            typical_latency = min(known) if known else 1.0
+            ready = [deployment for deployment in self.deployments
+                     if deployment.resting_until <= now and not self.breaker.is_open(deployment.name)]
+            resting = [deployment for deployment in self.deployments if deployment not in ready]
+            ready.sort(key=lambda deployment: self._score(deployment, typical_latency), reverse=True)
+            resting.sort(key=lambda deployment: deployment.resting_until)
+        return ready + resting
+
+    def create(self, **kwargs):
+        """
+        Sends a chat completions request to the best deployment, failing over to the others on 429s and errors.
+
+        Parameters:
+            kwargs: Arguments of chat.completions.create; the model is replaced by each deployment's name.
+
+        Returns:
+            ChatCompletion: The response. The error of the last deployment tried is raised if all fail.
+        """
+        last_error = None
+        for deployment in self._candidates():
+            try:
+                trial = self.breaker.check(deployment.name)
+            except CircuitOpenError as e:
+                last_error = last_error or e
+                continue
+
+            started = time.perf_counter()
+            try:
+                response = deployment.client.create(**dict(kwargs, model=deployment.deployment))
+            except Exception as e:
+                retryable, retry_after = classify_llm_error(e)
+                if not retryable:
+                    # The deployment answered (e.g. a 400 content filter answer), so it is not failing
+                    if getattr(e, 'response', None) is not None:
+                        self.breaker.record_success(deployment.name)
+                    elif trial:
+                        self.breaker.release(deployment.name)
+                    raise
+                last_error = e
+                self._record_failure(deployment, e, retry_after, trial)
+                continue
+            except BaseException:
+                if trial:
+                    self.breaker.release(deployment.name)
+                raise
+
+            self._record_success(deployment, time.perf_counter() - started)
+            return response
+        raise last_error
+
+    def _record_success(self, deployment, latency):
+        with self.lock:
+            if deployment.latency is None:
+                deployment.latency = latency
+            else:
+                deployment.latency += LATENCY_SMOOTHING * (latency - deployment.latency)
+        self.breaker.record_success(deployment.name)
+        metrics.increment('llm_routed_total', deployment=deployment.name)
+
+    def _record_failure(self, deployment, error, retry_after, trial=False):
+        status_code = getattr(error, 'status_code', None)
+        if status_code == 429:
+            with self.lock:
+                deployment.resting_until = time.monotonic() + (retry_after or DEFAULT_THROTTLE_REST)
+            # A throttled trial request does not tell whether the deployment is back, its circuit stays open
+            if trial:
+                self.breaker.release(deployment.name)
+        else:
+            self.breaker.record_failure(deployment.name)
+        metrics.increment('llm_failover_total', deployment=deployment.name)
+        logging.warning(f"GPT deployment {deployment.name} failed ({error}), trying another deployment.")
+
+    def close(self):
+        for deployment in self.deployments:
+            deployment.client.close()
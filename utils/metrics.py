@@ -0,0 +1,188 @@
+# This file collects the timing histograms and counters of a scraper run.
+# The hot paths (fetch, HTML tree build, traversal, prompt rendering, GPT call and output write) record their
+# durations here, labelled by parser and domain. At the end of a run the metrics are exported as a Prometheus
+# text file and/or a JSON summary, to see whether time went to one vendor site, to the model or to parsing.
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Prefix of the exported metric names
+PREFIX = 'osint_'
+
+# Upper bounds in seconds of the histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class _Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last count is the +Inf bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction):
+        """
+        Returns:
+            float: Upper bound of the bucket that holds the quantile (the maximum for the +Inf bucket).
+        """
+        rank = max(1, math.ceil(fraction * self.count))
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+        return self.max
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+
+
+def _format_labels(label_key, extra=None):
+    pairs = list(label_key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of labelled histograms and counters.
+
+    Parameters:
+        buckets (tuple): Upper bounds in seconds of the histogram buckets.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, name, seconds, **labels):
+        """
+        Records a duration in the histogram of the given name and labels.
+        """
+        key = (name, _label_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1, **labels):
+        """
+        Adds an amount to the counter of the given name and labels.
+        """
+        key = (name, _label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Records the duration of the with block in the histogram of the given name and labels.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def to_prometheus(self):
+        """
+        Returns:
+            str: The metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self.lock:
+            for metric in sorted({name for name, _ in self.histograms}):
+                lines.append(f'# TYPE {PREFIX}{metric} histogram')
+                for (name, label_key), histogram in sorted(self.histograms.items()):
+                    if name != metric:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{PREFIX}{name}_bucket{_format_labels(label_key, ("le", str(bound)))} {cumulative}')
+                    lines.append(f'{PREFIX}{name}_sum{_format_labels(label_key)} {histogram.sum}')
+                    lines.append(f'{PREFIX}{name}_count{_format_labels(label_key)} {histogram.count}')
+
+            for metric in sorted({name for name, _ in self.counters}):
+                lines.append(f'# TYPE {PREFIX}{metric} counter')
+                for (name, label_key), value in sorted(self.counters.items()):
+                    if name == metric:
+                        lines.append(f'{PREFIX}{name}{_format_labels(label_key)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def to_summary(self):
+        """
+        Returns:
+            dict: For every histogram the count, total, mean, maximum and approximate p50/p90/p99 in seconds,
+                and the value of every counter, keyed by metric name and labels.
+        """
+        summary = {'histograms': {}, 'counters': {}}
+        with self.lock:
+            for (name, label_key), histogram in sorted(self.histograms.items()):
+                summary['histograms'].setdefault(name, []).append({
+                    'labels': dict(label_key),
+                    'count': histogram.count,
+                    'sum': round(histogram.sum, 6),
+                    'mean': round(histogram.sum / histogram.count, 6),
+                    'max': round(histogram.max, 6),
+                    'p50': histogram.quantile(0.50),
+                    'p90': histogram.quantile(0.90),
+                    'p99': histogram.quantile(0.99)
+                })
+            for (name, label_key), value in sorted(self.counters.items()):
+                summary['counters'].setdefault(name, []).append({'labels': dict(label_key), 'value': value})
+        return summary
+
+    def export(self, prometheus_file=None, json_file=None):
+        """
+        Writes the metrics to a Prometheus text file and/or a JSON summary file.
+
+        Parameters:
+            prometheus_file (str): Path of the Prometheus text file, or None.
+            json_file (str): Path of the JSON summary file, or None.
+        """
+        if prometheus_file:
+            _write_file(prometheus_file, self.to_prometheus())
+        if json_file:
+            _write_file(json_file, json.dumps(self.to_summary(), indent=4) + '\n')
+
+
+def _write_file(path, content):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Written under a temporary name first, so a collector never reads a partial file
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as metrics_file:
+        metrics_file.write(content)
+    os.replace(temp_path, path)
+
+
+# Metrics of the current run, shared by all modules
+metrics = MetricsRegistry()
@@ -0,0 +1,254 @@
+# This file defines the output sinks that store the Osint items.
+# The JSONL sink appends every item as one line to a large file written sequentially. The file is written under
+# a '.part' name and renamed atomically when it is rotated (by size or age) or when the run ends, so a finished
+# '.jsonl' file is always complete. fsync is batched over many items instead of paid for every item, and the
+# caller is told which items are on disk once their batch is synced. '.part' files left by a run that crashed are
+# renamed when the next sink of the folder starts, without their incomplete last line.
+# The JSON sink keeps the original layout of one JSON file per item, with names that never collide.
+
+import datetime
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+PART_SUFFIX = '.part'
+
+
+def _process_running(pid):
+    if os.name == 'nt':
+        # os.kill cannot probe a process on Windows; renaming a file still open by its writer fails there instead
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _drop_partial_line(path):
+    """
+    Truncates a JSONL file after its last complete line.
+    """
+    with open(path, 'rb+') as jsonl_file:
+        end = jsonl_file.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - 65536)
+            jsonl_file.seek(start)
+            newline = jsonl_file.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                jsonl_file.truncate(start + newline + 1)
+                return
+            end = start
+        jsonl_file.truncate(0)
+
+
+def recover_part_files(directory, prefix='osint_items'):
+    """
+    Renames the '.part' files left by runs that ended without closing their JSONL sink (e.g. a crash) to their
+    final name, dropping the incomplete line they may end with. Files of running processes are left alone.
+
+    Parameters:
+        directory (str): Output folder.
+        prefix (str): File name prefix of the output files.
+
+    Returns:
+        list: Final paths of the recovered files.
+    """
+    recovered = []
+    suffix = '.jsonl' + PART_SUFFIX
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.startswith(prefix + '_') or not file_name.endswith(suffix):
+            continue
+        # File names end with _<pid>_<sequence>.jsonl.part
+        try:
+            pid = int(file_name[:-len(suffix)].split('_')[-2])
+        except (ValueError, IndexError):
+            continue
+        if pid == os.getpid() or _process_running(pid):
+            continue
+
+        part_path = os.path.join(directory, file_name)
+        path = part_path[:-len(PART_SUFFIX)]
+        try:
+            os.replace(part_path, path)
+        except OSError:
+            continue
+        _drop_partial_line(path)
+        logging.warning(f"Recovered output file {path} left by an interrupted run.")
+        recovered.append(path)
+    return recovered
+
+
+class JSONLSink:
+    """
+    Buffered, append-only JSONL writer with atomic rotation.
+
+    Parameters:
+        directory (str): Output folder (created if missing).
+        prefix (str): File name prefix of the output files.
+        max_bytes (int): Rotate the file once it reaches this size.
+        max_age (float): Rotate the file once it is older than this many seconds (checked when an item is written).
+        fsync_every (int): Flush and fsync the file after this many items.
+        buffer_size (int): Size of the write buffer in bytes.
+
+    '.part' files left in the folder by crashed runs are recovered (see recover_part_files) when the sink starts.
+    """
+
+    def __init__(self, directory, prefix='osint_items', max_bytes=64 * 1024 * 1024, max_age=3600,
+                 fsync_every=100, buffer_size=1024 * 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fsync_every = fsync_every
+        self.buffer_size = buffer_size
+        self.lock = threading.Lock()
+        self.sequence = itertools.count(1)
+
+        self.file = None
+        self.path = None
+        self.opened = 0
+        self.size = 0
+        self.unsynced = 0
+        self.pending = []  # Callbacks of the items written since the last fsync
+
+        recover_part_files(directory, prefix)
+
+    def _open(self):
+        timestamp = datetime.datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
+        file_name = f"{self.prefix}_{timestamp}_{os.getpid()}_{next(self.sequence)}.jsonl"
+        self.path = os.path.join(self.directory, file_name)
+        self.file = open(self.path + PART_SUFFIX, 'w', encoding='utf-8', buffering=self.buffer_size)
+        self.opened = time.monotonic()
+        self.size = 0
+        self.unsynced = 0
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+
+        pending, self.pending = self.pending, []
+        for on_durable in pending:
+            try:
+                on_durable(self.path)
+            except Exception as e:
+                logging.error(f"Error after writing an item to {self.path}: {e}")
+
+    def _finish(self):
+        """
+        Flushes, closes and renames the current '.part' file to its final name.
+        """
+        self._sync()
+        self.file.close()
+        os.replace(self.path + PART_SUFFIX, self.path)
+        logging.info(f"Finished output file {self.path} ({self.size} bytes)")
+        self.file = None
+
+    def write(self, item, on_durable=None):
+        """
+        Appends an item to the current output file.
+
+        Parameters:
+            item (dict): The Osint item.
+            on_durable (callable): Called with the final path of the file once the item is synced to disk,
+                possibly from another thread's write or from close().
+
+        Returns:
+            str: Final path of the file that contains the item.
+        """
+        line = json.dumps(item, ensure_ascii=False) + '\n'
+        with self.lock:
+            if self.file is not None and (self.size >= self.max_bytes
+                                          or time.monotonic() - self.opened >= self.max_age):
+                self._finish()
+            if self.file is None:
+                self._open()
+
+            self.file.write(line)
+            self.size += len(line.encode('utf-8'))
+            self.unsynced += 1
+            if on_durable is not None:
+                self.pending.append(on_durable)
+            if self.unsynced >= self.fsync_every:
+                self._sync()
+            return self.path
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self._finish()
+
+
+class JSONFileSink:
+    """
+    Writes every item to its own JSON file, named after the current time and a sequence number.
+
+    Parameters:
+        directory (str): Output folder (created if missing).
+        prefix (str): File name prefix of the output files.
+    """
+
+    def __init__(self, directory, prefix='data_output'):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.sequence = itertools.count(1)
+
+    def write(self, item, on_durable=None):
+        """
+        Parameters:
+            item (dict): The Osint item.
+            on_durable (callable): Called with the path of the file once the item is written.
+
+        Returns:
+            str: Path of the file written for the item.
+        """
+        current_time = datetime.datetime.now().strftime("%d-%m-%Y_%H-%M-%S")
+        while True:
+            with self.lock:
+                sequence = next(self.sequence)
+            file_path = os.path.join(self.directory, f"{self.prefix}_{current_time}_{sequence}.json")
+
+            # Mode 'x' never overwrites a file, e.g. one written by another run in the same second
+            try:
+                json_file = open(file_path, 'x')
+            except FileExistsError:
+                continue
+            with json_file:
+                json.dump(item, json_file, indent=4)
+            if on_durable is not None:
+                on_durable(file_path)
+            return file_path
+
+    def close(self):
+        pass
+
+
+def create_sink(format='jsonl', directory='.', max_file_mb=64, max_file_age=3600, fsync_every=100):
+    """
+    Creates the output sink set in the configuration file.
+
+    Parameters:
+        format (str): 'jsonl' for rotated JSONL files, or 'json' for one JSON file per item.
+        directory (str): Output folder.
+        max_file_mb (float): Size in MB after which a JSONL file is rotated.
+        max_file_age (float): Age in seconds after which a JSONL file is rotated.
+        fsync_every (int): Number of items between two fsync calls of a JSONL file.
+
+    Returns:
+        JSONLSink or JSONFileSink: The output sink.
+    """
+    if format == 'jsonl':
+        return JSONLSink(directory, max_bytes=int(max_file_mb * 1024 * 1024), max_age=max_file_age,
+                         fsync_every=fsync_every)
+    if format == 'json':
+        return JSONFileSink(directory)
+    raise ValueError(f"Unknown output format '{format}'.")
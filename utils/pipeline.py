@@ -0,0 +1,156 @@
+# This file implements a staged execution pipeline.
+# Each stage runs in its own pool of worker threads and stages are connected by bounded queues,
+# so a slow stage applies back-pressure to the stages before it instead of letting items pile up in memory.
+
+import logging
+import queue
+import threading
+
+# Marker put on a stage queue to tell one worker that no more items will arrive
+_STOP = object()
+
+
+class Stage:
+    """
+    A single step of the pipeline.
+
+    Parameters:
+        name (str): Name of the stage, used in logs and statistics.
+        func (callable): Called with one item. Returns the item passed to the next stage, or None to drop it.
+        workers (int): Number of worker threads running this stage.
+    """
+
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, workers={self.workers})"
+
+
+def _new_stats(stages):
+    return {stage.name: {'processed': 0, 'dropped': 0, 'failed': 0} for stage in stages}
+
+
+def _run_stage_func(stage, item, stats, lock):
+    """
+    Runs a stage function on one item and records the outcome.
+
+    Returns:
+        The stage result, or None if the item was dropped or the stage failed.
+    """
+    try:
+        result = stage.func(item)
+    except Exception as e:
+        logging.error(f"Pipeline stage '{stage.name}' failed: {e}")
+        outcome = 'failed'
+        result = None
+    else:
+        outcome = 'processed' if result is not None else 'dropped'
+
+    with lock:
+        stats[stage.name][outcome] += 1
+    return result
+
+
+def run_sequentially(stages, items):
+    """
+    Passes every item through all stages one at a time, in the calling thread.
+
+    Parameters:
+        stages (list): Ordered list of Stage objects.
+        items (iterable): Input items for the first stage.
+
+    Returns:
+        dict: Per-stage counters of processed, dropped and failed items.
+    """
+    stats = _new_stats(stages)
+    lock = threading.Lock()
+
+    for item in items:
+        for stage in stages:
+            item = _run_stage_func(stage, item, stats, lock)
+            if item is None:
+                break
+
+    return stats
+
+
+class Pipeline:
+    """
+    Runs items through a list of stages concurrently.
+
+    Every stage reads from its own bounded queue. When a queue is full the stage feeding it blocks,
+    which keeps memory bounded when a downstream stage falls behind.
+
+    Parameters:
+        stages (list): Ordered list of Stage objects.
+        queue_size (int): Maximum number of items waiting in front of each stage.
+    """
+
+    def __init__(self, stages, queue_size=32):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage.")
+        self.stages = list(stages)
+        self.queue_size = max(1, int(queue_size))
+
+    def run(self, items):
+        """
+        Feeds the items into the first stage and waits until every stage has drained.
+
+        Parameters:
+            items (iterable): Input items for the first stage.
+
+        Returns:
+            dict: Per-stage counters of processed, dropped and failed items.
+        """
+        stats = _new_stats(self.stages)
+        lock = threading.Lock()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        active_workers = [stage.workers for stage in self.stages]
+        threads = []
+
+        def worker(index):
+            stage = self.stages[index]
+            in_queue = queues[index]
+            out_queue = queues[index + 1] if index + 1 < len(self.stages) else None
+
+            while True:
+                item = in_queue.get()
+                if item is _STOP:
+                    break
+                result = _run_stage_func(stage, item, stats, lock)
+                if result is not None and out_queue is not None:
+                    out_queue.put(result)
+
+            # The last worker of a stage to finish tells every worker of the next stage to stop
+            with lock:
+                active_workers[index] -= 1
+                last_worker = active_workers[index] == 0
+            if last_worker and out_queue is not None:
+                for _ in range(self.stages[index + 1].workers):
+                    out_queue.put(_STOP)
+
+        for index, stage in enumerate(self.stages):
+            for number in range(stage.workers):
+                thread = threading.Thread(
+                    target=worker,
+                    args=(index,),
+                    name=f"{stage.name}-{number}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+
+        return stats
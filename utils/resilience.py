@@ -0,0 +1,224 @@
+# This file defines the retry and circuit breaker layer shared by the page downloads and the GPT requests.
+# Transient failures are retried after an exponential backoff with full jitter, or after the delay the server asks
+# for in Retry-After. A circuit breaker per key (a vendor host, or the GPT deployment) opens after consecutive
+# failures: while it is open, calls fail immediately instead of waiting for timeouts, and after a cool-down a
+# single trial call decides whether it closes again.
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from .metrics import metrics
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of making a call while the circuit of its key is open.
+    """
+
+
+class RetryPolicy:
+    """
+    How often and how long to retry a failing call.
+
+    Parameters:
+        retries (int): Number of retries after the first attempt.
+        base_delay (float): Backoff before the first retry in seconds, doubled after each retry.
+        max_delay (float): Longest backoff in seconds.
+        max_retry_after (float): Longest Retry-After delay in seconds that is honoured; longer ones fail the call.
+    """
+
+    def __init__(self, retries=3, base_delay=0.5, max_delay=30, max_retry_after=120):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Returns:
+            float: Seconds to wait before retry number attempt (0-based): the Retry-After delay if given,
+                else a random delay between 0 and the exponential backoff.
+        """
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def retry_after_seconds(headers):
+    """
+    Reads the delay a server asks for in the retry-after-ms or Retry-After header (seconds or HTTP date).
+
+    Returns:
+        float: The delay in seconds, or None if there is no valid header.
+    """
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Per-key circuit breaker.
+
+    Parameters:
+        failure_threshold (int): Consecutive failures that open the circuit of a key.
+        reset_timeout (float): Seconds the circuit stays open before a trial call is let through.
+        name (str): Name used in logs and metrics.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60, name='circuit'):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.failures = {}
+        self.opened_at = {}
+        self.trials = set()
+        self.lock = threading.Lock()
+
+    def check(self, key):
+        """
+        Raises CircuitOpenError if calls for the key must not be made now. After the cool-down, lets a single
+        trial call through.
+
+        Returns:
+            bool: True if the call is the trial call. Its outcome must then be recorded with record_success or
+                record_failure, or the trial ended with release.
+        """
+        with self.lock:
+            opened_at = self.opened_at.get(key)
+            if opened_at is None:
+                return False
+            if time.monotonic() - opened_at >= self.reset_timeout and key not in self.trials:
+                self.trials.add(key)
+                return True
+        self._reject(key)
+
+    def peek(self, key):
+        """
+        Raises CircuitOpenError like check(), but does not take the trial call of the key, so the call made
+        afterwards through check() can still be the trial.
+        """
+        with self.lock:
+            opened_at = self.opened_at.get(key)
+            if opened_at is None:
+                return
+            if time.monotonic() - opened_at >= self.reset_timeout and key not in self.trials:
+                return
+        self._reject(key)
+
+    def _reject(self, key):
+        metrics.increment('circuit_rejected_total', breaker=self.name, key=key)
+        raise CircuitOpenError(f"{self.name} circuit of {key} is open after repeated failures")
+
+    def is_open(self, key):
+        with self.lock:
+            return key in self.opened_at
+
+    def record_success(self, key):
+        with self.lock:
+            self.failures.pop(key, None)
+            self.trials.discard(key)
+            if self.opened_at.pop(key, None) is not None:
+                logging.info(f"The {self.name} circuit of {key} is closed again.")
+
+    def release(self, key):
+        """
+        Ends a trial call that neither succeeded nor failed (e.g. it was throttled or stopped without an answer).
+        The circuit stays open for another cool-down, after which a new trial call is let through.
+        """
+        with self.lock:
+            if key in self.trials:
+                self.trials.discard(key)
+                self.opened_at[key] = time.monotonic()
+
+    def record_failure(self, key):
+        with self.lock:
+            failures = self.failures[key] = self.failures.get(key, 0) + 1
+            trial = key in self.trials
+            self.trials.discard(key)
+            if trial or (key not in self.opened_at and failures >= self.failure_threshold):
+                self.opened_at[key] = time.monotonic()
+                opened = True
+            else:
+                opened = False
+        if opened:
+            metrics.increment('circuit_opened_total', breaker=self.name, key=key)
+            logging.warning(f"The {self.name} circuit of {key} is open for {self.reset_timeout} s "
+                            f"after {failures} consecutive failures.")
+
+
+def call_with_retries(func, policy, classify, key=None, breaker=None, description='call'):
+    """
+    Calls func, retrying transient failures according to the policy and the circuit breaker of the key.
+
+    Parameters:
+        func (callable): The call, without arguments.
+        policy (RetryPolicy): How often and how long to retry.
+        classify (callable): Called with an exception raised by func. Returns (retryable, retry_after):
+            whether the failure is transient and the delay asked for by the server (None if none).
+        key (str): Circuit breaker key of the call, e.g. the host.
+        breaker (CircuitBreaker): The circuit breaker, or None.
+        description (str): Name of the call in logs.
+
+    Returns:
+        The result of func. The last exception is raised when the retries are used up or the failure is not
+        transient, and CircuitOpenError when the circuit of the key is open.
+    """
+    attempt = 0
+    while True:
+        trial = breaker.check(key) if breaker is not None else False
+        try:
+            result = func()
+        except Exception as e:
+            retryable, retry_after = classify(e)
+            if not retryable:
+                # A server answering (e.g. 404) is not failing. Errors without an answer, such as the
+                # CircuitOpenError of an inner breaker, say nothing about it and only end a trial call.
+                if breaker is not None and getattr(e, 'response', None) is not None:
+                    breaker.record_success(key)
+                elif trial:
+                    breaker.release(key)
+                raise
+            # A server answering with Retry-After is throttling the calls, not failing
+            if breaker is not None and retry_after is None:
+                breaker.record_failure(key)
+            elif trial:
+                breaker.release(key)
+            if attempt >= policy.retries:
+                raise
+            if retry_after is not None and retry_after > policy.max_retry_after:
+                logging.warning(f"{description} asked to retry after {retry_after:.0f} s, giving up.")
+                raise
+            delay = policy.delay(attempt, retry_after)
+            logging.warning(f"{description} failed ({e}), retry {attempt + 1}/{policy.retries} in {delay:.1f} s.")
+            metrics.increment('retries_total', breaker=breaker.name if breaker is not None else None)
+            time.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            # Interrupted (e.g. Ctrl-C), the trial call has no outcome
+            if trial:
+                breaker.release(key)
+            raise
+
+        if breaker is not None:
+            breaker.record_success(key)
+        return result
@@ -0,0 +1,105 @@
+# This file defines a per-host cache of parsed robots.txt rules.
+# The robots.txt of a host is downloaded once, parsed once and shared by every check of a URL on that host
+# until its time-to-live expires. Concurrent checks of the same host wait for a single download.
+
+import logging
+import threading
+import time
+import urllib.robotparser
+from urllib.parse import urlparse
+import requests
+
+
+class RobotsEntry:
+    """
+    The robots.txt rules of one host.
+
+    Parameters:
+        robots_url (str): URL of the robots.txt file.
+        parser (RobotFileParser): The parsed rules, or None if the file could not be downloaded.
+        fetched_at (float): time.monotonic() of the download.
+        error (str): Reason the file could not be downloaded.
+    """
+
+    def __init__(self, robots_url, parser, fetched_at, error=None):
+        self.robots_url = robots_url
+        self.parser = parser
+        self.fetched_at = fetched_at
+        self.error = error
+
+
+class RobotsCache:
+    """
+    Per-host cache of parsed robots.txt rules with a time-to-live.
+
+    Parameters:
+        ttl (float): Seconds a downloaded robots.txt is reused.
+        error_ttl (float): Seconds a failed download is remembered before it is retried.
+        timeout (float): Timeout in seconds of a robots.txt download.
+        session (requests.Session): Session used for the downloads (keep-alive connections). A new one by default.
+    """
+
+    def __init__(self, ttl=3600, error_ttl=300, timeout=10, session=None):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.entries = {}
+        self.host_locks = {}
+        self.lock = threading.Lock()
+        self.fetches = 0
+
+    def _host_lock(self, origin):
+        with self.lock:
+            return self.host_locks.setdefault(origin, threading.Lock())
+
+    def _fresh(self, entry):
+        ttl = self.ttl if entry.parser is not None else self.error_ttl
+        return time.monotonic() - entry.fetched_at < ttl
+
+    def get(self, url, user_agent):
+        """
+        Returns the robots.txt rules of the host of a URL, downloading them if they are not cached or expired.
+
+        Parameters:
+            url (str): Any URL on the host.
+            user_agent (str): The user agent sent with the download.
+
+        Returns:
+            RobotsEntry: The cached rules of the host. Its parser is None if the download failed.
+        """
+        parsed_url = urlparse(url)
+        origin = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+        entry = self.entries.get(origin)
+        if entry is not None and self._fresh(entry):
+            return entry
+
+        # One download per host, the other checks of the host wait for it
+        with self._host_lock(origin):
+            entry = self.entries.get(origin)
+            if entry is None or not self._fresh(entry):
+                entry = self._download(f"{origin}/robots.txt", user_agent)
+                self.entries[origin] = entry
+        return entry
+
+    def _download(self, robots_url, user_agent):
+        with self.lock:
+            self.fetches += 1
+        try:
+            response = self.session.get(robots_url, headers={'User-Agent': user_agent}, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"Failed to fetch robots.txt from {robots_url}: {e}")
+            return RobotsEntry(robots_url, None, time.monotonic(), error=str(e))
+
+        logging.debug(f"Fetched robots.txt from {robots_url}:\n{response.text}")
+
+        # The downloaded text is parsed directly, RobotFileParser.read() would download the file again
+        parser = urllib.robotparser.RobotFileParser(robots_url)
+        parser.parse(response.text.splitlines())
+        return RobotsEntry(robots_url, parser, time.monotonic())
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -0,0 +1,176 @@
+# This file keeps the scraper polite to every vendor site while fetching concurrently.
+# Each host has a token bucket refilled at its allowed request rate: the configured default, a per-domain override,
+# or the slower rate asked for by the host's robots.txt (Crawl-delay / Request-rate). A fetch worker takes a token
+# before downloading a page and waits when the host's budget is used up. The URLs are also handed to the workers
+# interleaved by host, in the order of their earliest allowed start, so a list dominated by one site does not leave
+# the workers waiting on that site while the other sites are idle.
+
+import collections
+import heapq
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+from .metrics import metrics
+
+
+def _host(url):
+    return (urlparse(url).hostname or '').lower()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Parameters:
+        rate (float): Tokens added per second.
+        burst (int): Maximum number of tokens, i.e. requests allowed back to back after an idle period.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes a token, going into debt when none is left, so concurrent callers get consecutive time slots.
+
+        Returns:
+            float: Seconds to wait before using the token.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        """
+        Waits until a token is available and takes it.
+
+        Returns:
+            float: Seconds waited.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class DomainScheduler:
+    """
+    Per-host request budgets of the fetch stage.
+
+    Parameters:
+        requests_per_second (float): Default request rate allowed per host.
+        burst (int): Requests allowed back to back per host (1 for hosts limited by robots.txt).
+        domains (dict): Request rates of specific domains, subdomains included (e.g. {'microsoft.com': 2}).
+        robots_cache (RobotsCache): Cache of robots.txt rules to read Crawl-delay and Request-rate from, or None.
+        user_agent (str): The user agent the robots.txt rules are read for.
+        max_delay (float): Longest robots.txt delay in seconds between two requests that is honoured.
+    """
+
+    def __init__(self, requests_per_second=1.0, burst=2, domains=None, robots_cache=None, user_agent='*',
+                 max_delay=30):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.domains = {domain.lower(): rate for domain, rate in (domains or {}).items()}
+        self.robots_cache = robots_cache
+        self.user_agent = user_agent or '*'
+        self.max_delay = max_delay
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def robots_rate(self, url):
+        """
+        Returns:
+            float: The request rate asked for by the robots.txt of the URL's host, or None if it sets none.
+        """
+        if self.robots_cache is None:
+            return None
+        robots = self.robots_cache.get(url, self.user_agent)
+        if robots.parser is None:
+            return None
+
+        rates = []
+        crawl_delay = robots.parser.crawl_delay(self.user_agent)
+        if crawl_delay:
+            rates.append(1 / min(float(crawl_delay), self.max_delay))
+        request_rate = robots.parser.request_rate(self.user_agent)
+        if request_rate and request_rate.requests and request_rate.seconds:
+            rates.append(1 / min(request_rate.seconds / request_rate.requests, self.max_delay))
+        return min(rates) if rates else None
+
+    def configured_rate(self, host):
+        """
+        Returns:
+            float: The request rate of the longest configured domain matching the host, else the default rate.
+        """
+        matches = [domain for domain in self.domains if host == domain or host.endswith('.' + domain)]
+        return self.domains[max(matches, key=len)] if matches else self.requests_per_second
+
+    def bucket(self, url):
+        """
+        Returns:
+            TokenBucket: The bucket of the URL's host, created on first use.
+        """
+        host = _host(url)
+        with self.lock:
+            bucket = self.buckets.get(host)
+        if bucket is not None:
+            return bucket
+
+        # robots.txt is read outside the lock, the cache makes one download per host
+        rate = self.configured_rate(host)
+        burst = self.burst
+        robots_rate = self.robots_rate(url)
+        if robots_rate is not None and robots_rate < rate:
+            logging.info(f"robots.txt of {host} limits requests to {robots_rate:.3g} per second.")
+            rate, burst = robots_rate, 1
+
+        with self.lock:
+            return self.buckets.setdefault(host, TokenBucket(rate, burst))
+
+    def rate(self, url):
+        return self.bucket(url).rate
+
+    def wait(self, url):
+        """
+        Waits until a request to the URL's host fits in the host's budget.
+
+        Returns:
+            float: Seconds waited.
+        """
+        waited = self.bucket(url).acquire()
+        if waited > 0:
+            metrics.observe('politeness_wait_seconds', waited, domain=_host(url))
+        return waited
+
+    def interleave(self, urls):
+        """
+        Orders URLs by the earliest time each could start under its host's rate, round-robin between hosts
+        with the same rate.
+
+        Parameters:
+            urls (iterable): The URLs to fetch.
+
+        Yields:
+            str: The URLs in fetch order.
+        """
+        queues = collections.OrderedDict()
+        for url in urls:
+            queues.setdefault(_host(url), collections.deque()).append(url)
+
+        # (virtual start time, host order, host) of the next URL of every host
+        heap = [(0.0, order, host) for order, host in enumerate(queues)]
+        heapq.heapify(heap)
+        while heap:
+            start, order, host = heapq.heappop(heap)
+            url = queues[host].popleft()
+            yield url
+            if queues[host]:
+                heapq.heappush(heap, (start + 1 / self.rate(url), order, host))
@@ -0,0 +1,110 @@
+# This file defines the persistent per-URL state of the scraper, stored in SQLite.
+# Every URL keeps its last fetch time, the hash of its article text, its processing status and the output
+# file of its Osint item, so a run only processes the URLs that are new or whose article text changed.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# Processing statuses of a URL
+STATUS_NO_PARSER = 'no_parser'
+STATUS_NOT_ALLOWED = 'not_allowed'
+STATUS_FETCH_FAILED = 'fetch_failed'
+STATUS_EXTRACT_FAILED = 'extract_failed'
+STATUS_LLM_FAILED = 'llm_failed'
+STATUS_DONE = 'done'
+
+_FIELDS = ('last_fetch', 'content_hash', 'status', 'output_path')
+
+
+def content_hash(text):
+    """
+    Returns:
+        str: Hex SHA-256 digest of an article text.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class StateStore:
+    """
+    Per-URL processing state, shared by the pipeline worker threads.
+
+    Parameters:
+        path (str): Path of the SQLite database file (created if missing).
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            "url TEXT PRIMARY KEY, last_fetch REAL, content_hash TEXT, status TEXT, output_path TEXT, updated REAL)"
+        )
+        self.connection.commit()
+
+    def get(self, url):
+        """
+        Returns:
+            dict: The stored state of the URL, or None if the URL was never processed.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT last_fetch, content_hash, status, output_path FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+        return dict(zip(_FIELDS, row)) if row else None
+
+    def done_urls(self, urls):
+        """
+        Returns:
+            set: The given URLs whose Osint item was already written.
+        """
+        done = set()
+        with self.lock:
+            for url in urls:
+                row = self.connection.execute("SELECT status FROM urls WHERE url = ?", (url,)).fetchone()
+                if row and row[0] == STATUS_DONE:
+                    done.add(url)
+        return done
+
+    def record(self, url, **fields):
+        """
+        Updates the stored state of a URL.
+
+        Parameters:
+            url (str): The URL.
+            fields: Any of last_fetch, content_hash, status and output_path. Other fields are kept.
+        """
+        unknown = set(fields) - set(_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown URL state fields: {', '.join(sorted(unknown))}")
+
+        columns = ', '.join(fields)
+        placeholders = ', '.join('?' for _ in fields)
+        updates = ', '.join(f"{field} = excluded.{field}" for field in fields)
+        with self.lock:
+            self.connection.execute(
+                f"INSERT INTO urls (url, {columns}, updated) VALUES (?, {placeholders}, ?) "
+                f"ON CONFLICT(url) DO UPDATE SET {updates}, updated = excluded.updated",
+                (url, *fields.values(), time.time())
+            )
+            self.connection.commit()
+
+    def status_counts(self):
+        """
+        Returns:
+            dict: Number of stored URLs per status.
+        """
+        with self.lock:
+            return dict(self.connection.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall())
+
+    def close(self):
+        with self.lock:
+            self.connection.close()